@@ -1,3 +1,4 @@
+import numpy
 import pygame
 import typing
 if typing.TYPE_CHECKING:
@@ -45,6 +46,7 @@ class UIPropertyAnim(UIAnimation):
         self.element.playing_animations.append(self)
         self.property_type: AnimPropertyType = property_type
         self.repeat_mode: AnimRepeatMode = repeat_mode
+        self.ease_func_name: AnimEaseFunc = ease_func_name
         self.ease_func = common.ANIMATION_FUNCTIONS[ease_func_name]
         self.direction = 1
         self.increase_dir = 1 if increase >= 0 else -1
@@ -104,15 +106,16 @@ class UIPropertyAnim(UIAnimation):
         self.element.status.invoke_callback("on_animation_end", self)
         self.element.set_dirty()
 
-    def logic(self):
+    def logic(self, eased: float | None = None):
         if not self.started:
             return
         if self.element is None:
             self.dead = True
             return
 
-        lerp_val = pygame.math.lerp(0, self.end_value, self.ease_func(
-            self.get_elapsed_time()/self.duration_ms))
+        if eased is None:
+            eased = self.ease_func(self.get_elapsed_time()/self.duration_ms)
+        lerp_val = pygame.math.lerp(0, self.end_value, eased)
         if self.direction == 1:
             self.current_value = lerp_val
             if self.current_value > self.end_value-1:
@@ -246,12 +249,30 @@ class UIAnimUpdater:
     @classmethod
     def logic(cls):
         """[Internal] Update animations and remove finished ones. Called by 'static_logic'"""
+        eased_values = cls._batch_ease()
         for anim in list(cls.animations):
-            anim.logic()
+            anim.logic(eased_values.get(anim))
             if anim.dead:
                 cls.animations.remove(anim)
                 anim.element.playing_animations.remove(anim)
 
+    @classmethod
+    def _batch_ease(cls) -> dict[UIPropertyAnim, float]:
+        """[Internal] Evaluate the easing of animations sharing a function in one vectorized call"""
+        ease_groups: dict[str, list[UIPropertyAnim]] = {}
+        for anim in cls.animations:
+            if anim.started and anim.element is not None:
+                ease_groups.setdefault(anim.ease_func_name, []).append(anim)
+        eased_values = {}
+        ticks = pygame.time.get_ticks()
+        for ease_func_name, anims in ease_groups.items():
+            if len(anims) < common.ANIMATION_BATCH_MIN:
+                continue
+            progress = numpy.array([(ticks-anim.start_time)/anim.duration_ms for anim in anims], numpy.float64)
+            eased = common.ANIMATION_FUNCTIONS_VEC[ease_func_name](progress).tolist()
+            eased_values.update(zip(anims, eased))
+        return eased_values
+
     @classmethod
     def register(cls, animation: UIPropertyAnim) -> typing.Self:
         """[Internal] Add an animation to the animations to update. Called automatically by the animation"""
@@ -1,7 +1,14 @@
 import math
+import bisect
+import itertools
+import importlib.util
+import numpy
 import pygame
 import typing
+import weakref
 import warnings
+from collections import OrderedDict
+from types import MappingProxyType
 if typing.TYPE_CHECKING:
     from .elements.element import Element
 
@@ -16,18 +23,138 @@ StatusCallback: typing.TypeAlias = typing.Callable[[
 CursorLike: typing.TypeAlias = pygame.Cursor | int
 
 
+# numba is imported the first time something is compiled, importing it costs more than the whole package
+NUMBA_AVAILABLE: bool = importlib.util.find_spec("numba") is not None
+_compiled: dict[typing.Callable, typing.Callable] = {}
+
+
+def _jit_exact(func: typing.Callable) -> typing.Callable:
+    # no fastmath, results must truncate exactly like the python path
+    if func not in _compiled:
+        from numba import njit
+        _compiled[func] = njit(cache=True)(func)
+    return _compiled[func]
+
+
+TEXT_WIDTH_CACHE_SIZE: int = 4096
+_text_width_cache: "weakref.WeakKeyDictionary[pygame.Font, dict[str, int]]" = weakref.WeakKeyDictionary()
+WRAP_CACHE_SIZE: int = 512
+_wrap_cache: "weakref.WeakKeyDictionary[pygame.Font, OrderedDict[tuple[str, int], list[str]]]" = weakref.WeakKeyDictionary()
+# the file SysFont picks for each font name, None for the default font
+_sysfont_paths: dict[str, str | None] = {}
+FONT_CACHE_SIZE: int = 64
+# fonts shared between the text styles, they are never modified once in here
+_font_cache: "OrderedDict[tuple, pygame.Font]" = OrderedDict()
+ADVANCE_CACHE_SIZE: int = 1024
+_advance_cache: "weakref.WeakKeyDictionary[pygame.Font, dict[str, list[int]]]" = weakref.WeakKeyDictionary()
+MENU_CACHE_SIZE: int = 128
+_menu_cache: "OrderedDict[tuple[int, int, int, int], tuple[pygame.Surface, pygame.Surface]]" = OrderedDict()
+SURFACE_POOL_GRID: int = 32
+SURFACE_POOL_BUCKET_SIZE: int = 4
+_surface_pool: dict[tuple[int, int], list[pygame.Surface]] = {}
+_pooled_surfaces: "weakref.WeakSet[pygame.Surface]" = weakref.WeakSet()
+
+
 class UIAnchorData:
     def __init__(self, target: "Element", self_anchor: str, target_anchor: str, offset: Coordinate):
         self.target: "Element" = target
         self.self_anchor: str = self_anchor
         self.target_anchor: str = target_anchor
+        # resolved once for the batched anchor pass, anchors are replaced rather than edited
+        self.target_anchor_idx: int = ANCHOR_INDEXES[target_anchor]
         self.offset: float = offset
-        
+
+
+ANCHOR_NAMES: tuple[str, ...] = ("left", "right", "top", "bottom", "centerx", "centery")
+ANCHOR_INDEXES: MappingProxyType[str, int] = MappingProxyType({name: i for i, name in enumerate(ANCHOR_NAMES)})
+# bits of Element._anchor_mask
+ANCHOR_X_MASK: int = 0b000011
+ANCHOR_Y_MASK: int = 0b001100
+ANCHOR_CENTERX_BIT: int = 0b010000
+ANCHOR_CENTERY_BIT: int = 0b100000
+ANCHOR_BATCH_MIN: int = 128
+
+
+def resolve_anchor_rects(target_values: numpy.ndarray, anchor_idx: numpy.ndarray, offsets: numpy.ndarray, rects: numpy.ndarray) -> numpy.ndarray:
+    # target_values: (6,) the target rect sides in ANCHOR_NAMES order
+    # anchor_idx: (N, 6) target side followed by each observer side, -1 if the side isn't anchored
+    # offsets: (N, 6) anchor offsets, rects: (N, 4) absolute x, y, w, h of the observers
+    # returns (N, 4) the new absolute x, y, w, h, truncated like pygame.Rect does
+    if NUMBA_AVAILABLE:
+        new_rects = numpy.empty((rects.shape[0], 4), numpy.int64)
+        _jit_exact(_resolve_anchor_rects_loop)(target_values, anchor_idx, offsets, rects, new_rects)
+        return new_rects
+    present = anchor_idx >= 0
+    values = target_values[anchor_idx.clip(0)]+offsets
+    x, y, w, h = rects.T
+
+    def axis(pos, size, start_i, end_i, center_i):
+        has_start, has_end = present[:, start_i], present[:, end_i]
+        start, end = values[:, start_i], values[:, end_i]
+        low = numpy.where(has_start, start, numpy.where(has_end, end-size, pos))
+        high = numpy.where(has_end, end, numpy.where(has_start, start+size, pos+size))
+        high = numpy.where(high <= low, low+1, high)
+        has_center = present[:, center_i]
+        new_pos = numpy.where(has_center, numpy.trunc(values[:, center_i])-size//2, numpy.trunc(low))
+        new_size = numpy.where(has_center, size, numpy.trunc(high-low))
+        return new_pos, new_size
+
+    new_x, new_w = axis(x, w, 0, 1, 4)
+    new_y, new_h = axis(y, h, 2, 3, 5)
+    return numpy.stack((new_x, new_y, new_w, new_h), axis=1).astype(numpy.int64)
+
+
+def _resolve_anchor_rects_loop(target_values, anchor_idx, offsets, rects, new_rects):
+    # compiled version of resolve_anchor_rects, same operations one observer at a time
+    for i in range(rects.shape[0]):
+        for axis in range(2):
+            start_i, end_i, center_i = axis*2, axis*2+1, 4+axis
+            pos, size = rects[i, axis], rects[i, 2+axis]
+            if anchor_idx[i, center_i] >= 0:
+                new_rects[i, axis] = numpy.trunc(target_values[anchor_idx[i, center_i]]+offsets[i, center_i])-size//2
+                new_rects[i, 2+axis] = size
+                continue
+            has_start, has_end = anchor_idx[i, start_i] >= 0, anchor_idx[i, end_i] >= 0
+            start = target_values[anchor_idx[i, start_i]]+offsets[i, start_i] if has_start else 0.0
+            end = target_values[anchor_idx[i, end_i]]+offsets[i, end_i] if has_end else 0.0
+            low = start if has_start else (end-size if has_end else pos)
+            high = end if has_end else (start+size if has_start else pos+size)
+            if high <= low:
+                high = low+1
+            new_rects[i, axis] = numpy.trunc(low)
+            new_rects[i, 2+axis] = numpy.trunc(high-low)
+
 
 def warn(message: str):
     warnings.warn(message, UserWarning)
 
 
+def acquire_surface(size: Coordinate) -> pygame.Surface:
+    """[Internal] Return a SRCALPHA surface of the given size, a subsurface of a pooled buffer rounded up to the pool grid. Its content is undefined"""
+    w, h = max(int(size[0]), 1), max(int(size[1]), 1)
+    grid = SURFACE_POOL_GRID
+    key = (-(-w//grid)*grid, -(-h//grid)*grid)
+    bucket = _surface_pool.get(key)
+    if bucket:
+        backing = bucket.pop()
+    else:
+        backing = pygame.Surface(key, pygame.SRCALPHA)
+        _pooled_surfaces.add(backing)
+    return backing.subsurface((0, 0, w, h))
+
+
+def release_surface(surface: pygame.Surface | None):
+    """[Internal] Give the buffer of a surface returned by acquire_surface back to the pool. The surface must not be used after"""
+    if surface is None:
+        return
+    backing = surface.get_parent()
+    if backing is None or backing not in _pooled_surfaces:
+        return
+    bucket = _surface_pool.setdefault(backing.get_size(), [])
+    if len(bucket) < SURFACE_POOL_BUCKET_SIZE:
+        bucket.append(backing)
+
+
 def style_id_or_copy(element: "Element", style_id: str) -> str:
     return element.style_id if style_id == "copy" else style_id
 
@@ -59,50 +186,202 @@ def align_text(t_rect: pygame.Rect, el_rect: pygame.Rect, padding: int, y_paddin
     return t_rect
 
 
+def _wrap_paragraph_words(paragraph: str, wrapsize: int, font: pygame.Font, space: int) -> list[str]:
+    words = paragraph.split(' ')
+    x, y, maxw, i = 0, 0, wrapsize, 0
+    lines = []
+    line = ""
+    font_size = font.size
+    for abs_i, word in enumerate(words):
+        if not word:
+            continue
+        wordw, wordh = font_size(word)
+        if i != 0:
+            line += " "
+        line += word
+        if x + wordw >= maxw:
+            x = i = 0
+            y += wordh
+            if abs_i != 0:
+                line = line.removesuffix(" "+word)
+            lines.append(line)
+            if abs_i != 0:
+                line = word
+        x += wordw
+        if x != 0:
+            x += space
+        i += 1
+    lines.append(line)
+    return lines
+
+
+def _wrap_paragraph(paragraph: str, wrapsize: int, font: pygame.Font, estimate: int) -> list[str]:
+    text = " ".join(word for word in paragraph.split(' ') if word)
+    if not text:
+        return [""]
+    lines = []
+    start, length = 0, len(text)
+    while start < length:
+        # measure the estimated slice once, then retract/extend it one character at a time
+        end = min(start+estimate, length)
+        width = text_width(font, text[start:end])
+        while end > start+1 and width >= wrapsize:
+            end -= 1
+            width -= text_width(font, text[end])
+        while end < length and width+text_width(font, text[end]) < wrapsize:
+            width += text_width(font, text[end])
+            end += 1
+        if end < length and text[end] != " ":
+            # clip back to the last space, a word wider than the line stays whole
+            if (space_i := text.rfind(" ", start, end)) != -1:
+                end = space_i
+            elif (space_i := text.find(" ", end)) != -1:
+                end = space_i
+            else:
+                end = length
+        # per character widths drift from the real slice width, settle the word boundary with real measurements
+        while end < length and text_width(font, text[start:end]) >= wrapsize and (space_i := text.rfind(" ", start, end)) != -1:
+            end = space_i
+        while end < length:
+            if (next_end := text.find(" ", end+1)) == -1:
+                next_end = length
+            if text_width(font, text[start:next_end]) >= wrapsize:
+                break
+            end = next_end
+        lines.append(text[start:end])
+        start = end+1
+    return lines
+
+
 def text_wrap_str(text: str, wrapsize: int, font: pygame.Font) -> list[str]:
+    # wraps are cached per font object like widths
+    try:
+        wraps = _wrap_cache[font]
+    except KeyError:
+        wraps = _wrap_cache[font] = OrderedDict()
+    key = (text, wrapsize)
+    if (lines := wraps.get(key)) is not None:
+        wraps.move_to_end(key)
+        return list(lines)
+    lines = wraps[key] = _wrap_text(text, wrapsize, font)
+    if len(wraps) > WRAP_CACHE_SIZE:
+        wraps.popitem(False)
+    return list(lines)
+
+
+def _wrap_text(text: str, wrapsize: int, font: pygame.Font) -> list[str]:
     text = text.strip()
     if not text:
         return []
     paragraphs = text.split("\n")
     paragraph_lines = []
-    space = font.size(' ')[0]
+    char_w = max(text_width(font, 'a'), 1)
+    if wrapsize < char_w*2:
+        space = text_width(font, ' ')
+        for paragraph in paragraphs:
+            paragraph_lines += _wrap_paragraph_words(paragraph, wrapsize, font, space)
+        return paragraph_lines
+    estimate = wrapsize//char_w
     for paragraph in paragraphs:
-        words = paragraph.split(' ')
-        x, y, maxw, i = 0, 0, wrapsize, 0
-        lines = []
-        line = ""
-        for abs_i, word in enumerate(words):
-            if not word:
-                continue
-            wordw, wordh = font.render(word, True, (0, 0, 0)).get_size()
-            if i != 0:
-                line += " "
-            line += word
-            if x + wordw >= maxw:
-                x = i = 0
-                y += wordh
-                if abs_i != 0:
-                    line = line.removesuffix(" "+word)
-                lines.append(line)
-                if abs_i != 0:
-                    line = word
-            x += wordw
-            if x != 0:
-                x += space
-            i += 1
-        lines.append(line)
-        paragraph_lines += lines
+        paragraph_lines += _wrap_paragraph(paragraph, wrapsize, font, estimate)
     return paragraph_lines
 
 
+def sysfont(name: str, size: int) -> pygame.Font:
+    """[Internal] Same as pygame.font.SysFont without bold and italic, the name is only looked up the first time"""
+    if name not in _sysfont_paths:
+        _sysfont_paths[name] = pygame.font.SysFont(name, size, constructor=lambda fontpath, *_: fontpath)
+    return pygame.Font(_sysfont_paths[name], size)
+
+
+def shared_font(build: typing.Callable[[str, int], pygame.Font], name: str, size: int, mods: tuple[int, bool, bool, bool, bool]) -> pygame.Font:
+    """[Internal] Return the font made by build(name, size) with align, bold, italic, underline and strikethrough set to mods, the same object for the same arguments"""
+    key = (build, name, size, mods)
+    if (font := _font_cache.get(key)) is not None:
+        _font_cache.move_to_end(key)
+        return font
+    font = _font_cache[key] = build(name, size)
+    font.align, font.bold, font.italic, font.underline, font.strikethrough = mods
+    if len(_font_cache) > FONT_CACHE_SIZE:
+        _font_cache.popitem(False)
+    return font
+
+
+def text_width(font: pygame.Font, text: str) -> int:
+    # widths are cached per font object, the cache of a font dies with it
+    try:
+        widths = _text_width_cache[font]
+    except KeyError:
+        widths = _text_width_cache[font] = {}
+    try:
+        return widths[text]
+    except KeyError:
+        if len(widths) >= TEXT_WIDTH_CACHE_SIZE:
+            widths.clear()
+        width = widths[text] = font.size(text)[0]
+        return width
+
+
+def clear_text_width_cache(font: pygame.Font | None = None):
+    # wraps depend on widths and are cleared with them
+    if font is None:
+        _text_width_cache.clear()
+        _advance_cache.clear()
+        _wrap_cache.clear()
+    else:
+        _text_width_cache.pop(font, None)
+        _advance_cache.pop(font, None)
+        _wrap_cache.pop(font, None)
+
+
 def line_size_x(font: pygame.Font, line: str) -> int:
-    size = 0
-    for c in line:
-        size += font.size(c)[0]
-    return size
+    # sum of the character widths, shared with the click and selection lookups. it is not the
+    # rendered width of the line, font.size(line) includes kerning and differs on long lines
+    if not line:
+        return 0
+    return line_advances(font, line)[-1]
+
+
+def line_advances(font: pygame.Font, line: str) -> list[int]:
+    # cumulative widths of the characters measured one by one, cached per font like the widths.
+    # font.metrics() advances would ignore bold, so the per character size is kept
+    try:
+        advances = _advance_cache[font]
+    except KeyError:
+        advances = _advance_cache[font] = {}
+    try:
+        return advances[line]
+    except KeyError:
+        pass
+    if len(advances) >= ADVANCE_CACHE_SIZE:
+        advances.clear()
+    cumulative = advances[line] = list(itertools.accumulate(text_width(font, char) for char in line))
+    return cumulative
+
+
+_LINE_ALIGN_OFFSETS: dict[int, typing.Callable[[int, int], int]] = {
+    pygame.FONT_LEFT: lambda rect_w, line_w: 0,
+    pygame.FONT_CENTER: lambda rect_w, line_w: rect_w//2-line_w//2,
+    pygame.FONT_RIGHT: lambda rect_w, line_w: rect_w-line_w,
+}
+
+
+def _line_align_offset(font_align: int) -> typing.Callable[[int, int], int]:
+    # x offset of a line inside the text rect for the font alignment
+    return _LINE_ALIGN_OFFSETS.get(font_align, _LINE_ALIGN_OFFSETS[pygame.FONT_LEFT])
+
 
+def _width_before(cumulative: list[int], char_i: int) -> int:
+    # width of the first char_i characters given the cumulative advances of the line
+    return cumulative[min(char_i, len(cumulative))-1] if char_i > 0 and cumulative else 0
 
-def text_click_idx(lines: list[str], font: pygame.Font, pos: pygame.Vector2, rect: pygame.Rect, absolute_topleft: pygame.Vector2) -> tuple[int, int, int, str] | None:
+
+def line_len_prefix(lines: list[str]) -> list[int]:
+    return list(itertools.accumulate((len(line) for line in lines), initial=0))
+
+
+def text_click_idx(lines: list[str], font: pygame.Font, pos: pygame.Vector2, rect: pygame.Rect, absolute_topleft: Coordinate,
+                   line_len_prefix: list[int] | None = None) -> tuple[int, int, int, list[str]] | None:
     if len(lines) <= 0:
         return
     rel_pos = pos-absolute_topleft
@@ -114,28 +393,24 @@ def text_click_idx(lines: list[str], font: pygame.Font, pos: pygame.Vector2, rec
     line = lines[line_idx]
     if not line:
         return
-    tot_w = char_i = 0
-    start_x = rect.left
-    if font.align == pygame.FONT_CENTER:
-        start_x = rect.left+rect.w//2-line_size_x(font, line)//2
-    elif font.align == pygame.FONT_RIGHT:
-        start_x = rect.left+rect.w-line_size_x(font, line)
-    if rel_pos.x <= start_x:
+    cumulative = line_advances(font, line)
+    start_x = rect.left+_line_align_offset(font.align)(rect.w, cumulative[-1])
+    rel_x = rel_pos.x
+    if rel_x <= start_x:
         return
-    for i, char in enumerate(line):
-        char_w = font.size(char)[0]
-        tot_w += char_w
-        if tot_w+start_x >= rel_pos.x:
-            char_i = i
-            break
-    else:
+    # first character whose right edge reaches the mouse
+    char_i = bisect.bisect_left(cumulative, rel_x-start_x)
+    if char_i >= len(cumulative):
         return
-    tot_i = 0
-    if line_idx > 0:
-        for l in lines[:line_idx]:
-            tot_i += len(l)
+    if line_len_prefix is not None:
+        tot_i = line_len_prefix[line_idx]
+    else:
+        tot_i = 0
+        if line_idx > 0:
+            for l in lines[:line_idx]:
+                tot_i += len(l)
     tot_i += char_i
-    return char_i, line_idx, tot_i, "".join(lines)
+    return char_i, line_idx, tot_i, lines
 
 
 def text_select_rects(start_li: int, start_ci: int, end_li: int, end_ci: int, lines: list[str], font: pygame.Font, rect: pygame.Rect, rel_move: bool = False) -> list[pygame.Rect]:
@@ -144,47 +419,37 @@ def text_select_rects(start_li: int, start_ci: int, end_li: int, end_ci: int, li
         start_ci, end_ci = end_ci, start_ci
     rects = []
     font_h = font.get_height()
+    Rect = pygame.Rect
+    left, top, rect_w = rect.left, rect.top, rect.w
     try:
+        # cumulative advances of the selected lines, any slice width is a difference of two entries
+        line_cumulatives = [line_advances(font, line) if line else [] for line in lines[start_li:end_li+1]]
+        line_widths = [cumulative[-1] if cumulative else 0 for cumulative in line_cumulatives]
+        line_offset = _line_align_offset(font.align)
+        offsets = [line_offset(rect_w, line_w) for line_w in line_widths]
         if start_li == end_li:
-            line = lines[start_li]
-            offset = 0
-            if font.align == pygame.FONT_CENTER:
-                offset = rect.w//2-line_size_x(font, line)//2
-            elif font.align == pygame.FONT_RIGHT:
-                offset = rect.w-line_size_x(font, line)
+            cumulative = line_cumulatives[0]
+            offset = offsets[0]
             if start_ci == end_ci:
                 if not rel_move or not UIState.mouse_pressed[0]:
                     return rects
-                char = lines[start_li][start_ci]
-                rects.append(pygame.Rect(rect.left+offset+line_size_x(font, line[:start_ci]), font_h*start_li+rect.top, line_size_x(font, char), font_h))
+                start_x = _width_before(cumulative, start_ci)
+                rects.append(Rect(left+offset+start_x, font_h*start_li+top, cumulative[start_ci]-start_x, font_h))
                 return rects
             if start_ci > end_ci:
                 start_ci, end_ci = end_ci, start_ci
-            rects.append(pygame.Rect(rect.left+offset+line_size_x(font, line[:start_ci]),
-                                     font_h*start_li+rect.top, line_size_x(font, line[start_ci:end_ci+1]), font_h))
+            start_x = _width_before(cumulative, start_ci)
+            rects.append(Rect(left+offset+start_x,
+                              font_h*start_li+top, _width_before(cumulative, end_ci+1)-start_x, font_h))
         else:
-            mid_lines = lines[start_li+1:end_li]
-            start_line = lines[start_li]
-            end_line = lines[end_li]
-            start_offset = end_offset = 0
-            if font.align == pygame.FONT_CENTER:
-                start_offset = rect.w//2-line_size_x(font, start_line)//2
-                end_offset = rect.w//2-line_size_x(font, end_line)//2
-            elif font.align == pygame.FONT_RIGHT:
-                start_offset = rect.w-line_size_x(font, start_line)
-                end_offset = rect.w-line_size_x(font, end_line)
-            rects.append(pygame.Rect(rect.left+start_offset+line_size_x(font, start_line[:start_ci]),
-                                     font_h*start_li+rect.top, line_size_x(font, start_line[start_ci:]), font_h))
-            rects.append(pygame.Rect(rect.left+end_offset, font_h*end_li +
-                         rect.top, line_size_x(font, end_line[:end_ci+1]), font_h))
-            for i, line in enumerate(mid_lines):
-                offset = 0
-                if font.align == pygame.FONT_CENTER:
-                    offset = rect.w//2-line_size_x(font, line)//2
-                elif font.align == pygame.FONT_RIGHT:
-                    offset = rect.w-line_size_x(font, line)
-                rects.append(pygame.Rect(rect.left+offset, font_h *
-                             (i+start_li+1)+rect.top, line_size_x(font, line), font_h))
+            start_x = _width_before(line_cumulatives[0], start_ci)
+            rects.append(Rect(left+offsets[0]+start_x,
+                              font_h*start_li+top, line_widths[0]-start_x, font_h))
+            rects.append(Rect(left+offsets[-1], font_h*end_li +
+                              top, _width_before(line_cumulatives[-1], end_ci+1), font_h))
+            append = rects.append
+            for i in range(1, end_li-start_li):
+                append(Rect(left+offsets[i], font_h*(i+start_li)+top, line_widths[i], font_h))
     except Exception as e:
         return rects
     return rects
@@ -200,20 +465,40 @@ def text_select_copy(start_li: int, start_ci: int, end_li: int, end_ci: int, lin
             start_ci, end_ci = end_ci, start_ci
         copy_str = lines[start_li][start_ci:end_ci+1]
     else:
-        mid_lines = lines[start_li+1:end_li]
-        copy_str += " "*start_ci+lines[start_li][start_ci:]+"\n"
-        for line in mid_lines:
-            copy_str += line+"\n"
-        copy_str += lines[end_li][:end_ci]
+        parts = [" "*start_ci+lines[start_li][start_ci:]]
+        parts.extend(lines[start_li+1:end_li])
+        parts.append(lines[end_li][:end_ci])
+        copy_str = "\n".join(parts)
     pygame.scrap.put_text(copy_str)
 
 
+def _scale_into(surface: pygame.Surface, size: tuple[int, int], dest_surface: pygame.Surface, pos: tuple[int, int], direct: bool = True):
+    # scale straight into the destination area, blit a scaled copy when formats or bounds don't allow it
+    if direct and surface.get_masks() == dest_surface.get_masks() and surface.get_bitsize() == dest_surface.get_bitsize():
+        try:
+            pygame.transform.scale(surface, size, dest_surface.subsurface((pos, size)))
+            return
+        except (ValueError, pygame.error):
+            pass
+    dest_surface.blit(pygame.transform.scale(surface, size), pos)
+
+
+def invalidate_menu_cache(original_image: pygame.Surface):
+    for key in [key for key in _menu_cache if key[0] == id(original_image)]:
+        del _menu_cache[key]
+
+
 def generate_menu_surface(original_image: pygame.Surface, width: int, height: int, border: int) -> pygame.Surface:
     if border < 1:
         return original_image
     # setup
     s, s2 = border, border*2
     width, height = int(width), int(height)
+    # cache, the original image is stored with the result so its id can't be reused
+    key = (id(original_image), width, height, border)
+    if (cached := _menu_cache.get(key)) is not None and cached[0] is original_image:
+        _menu_cache.move_to_end(key)
+        return cached[1]
     menu_surf: pygame.Surface = original_image
     mw, mh = menu_surf.get_width(), menu_surf.get_height()
     # main surfs
@@ -222,33 +507,25 @@ def generate_menu_surface(original_image: pygame.Surface, width: int, height: in
     except pygame.error:
         return original_image
     big_surf.fill(0)
-    inner_surf = pygame.transform.scale(menu_surf.subsurface(
-        (s, s, mw-s2, mh-s2)), (max(width-s2, 1), max(height-s2, 1)))
+    inner_w, inner_h = max(width-s2, 1), max(height-s2, 1)
+    # too small surfaces overlap the pieces, they need blending
+    direct = width > s2 and height > s2
+    # inner
+    _scale_into(menu_surf.subsurface((s, s, mw-s2, mh-s2)), (inner_w, inner_h), big_surf, (s, s), direct)
     # corners
-    topleft = menu_surf.subsurface((0, 0, s, s))
-    topright = menu_surf.subsurface((mw-s, 0, s, s))
-    bottomleft = menu_surf.subsurface((0, mh-s, s, s))
-    bottomright = menu_surf.subsurface((mw-s, mh-s, s, s))
+    big_surf.blit(menu_surf.subsurface((0, 0, s, s)), (0, 0))
+    big_surf.blit(menu_surf.subsurface((mw-s, 0, s, s)), (width-s, 0))
+    big_surf.blit(menu_surf.subsurface((0, mh-s, s, s)), (0, height-s))
+    big_surf.blit(menu_surf.subsurface((mw-s, mh-s, s, s)), (width-s, height-s))
     # sides
-    top = pygame.transform.scale(menu_surf.subsurface(
-        (s, 0, mw-s2, s)), (max(width-s2, 1), s))
-    bottom = pygame.transform.scale(menu_surf.subsurface(
-        (s, mh-s, mw-s2, s)), (max(width-s2, 1), s))
-    left = pygame.transform.scale(menu_surf.subsurface(
-        (0, s, s, mh-s2)), (s, max(height-s2, 1)))
-    right = pygame.transform.scale(menu_surf.subsurface(
-        (mw-s, s, s, mh-s2)), (s, max(height-s2, 1)))
-    # blitting
-    big_surf.blit(inner_surf, (s, s))
-    big_surf.blit(topleft, (0, 0))
-    big_surf.blit(topright, (width-s, 0))
-    big_surf.blit(bottomleft, (0, height-s))
-    big_surf.blit(bottomright, (width-s, height-s))
-    big_surf.blit(top, (s, 0))
-    big_surf.blit(bottom, (s, height-s))
-    big_surf.blit(left, (0, s))
-    big_surf.blit(right, (width-s, s))
-    # return
+    _scale_into(menu_surf.subsurface((s, 0, mw-s2, s)), (inner_w, s), big_surf, (s, 0), direct)
+    _scale_into(menu_surf.subsurface((s, mh-s, mw-s2, s)), (inner_w, s), big_surf, (s, height-s), direct)
+    _scale_into(menu_surf.subsurface((0, s, s, mh-s2)), (s, inner_h), big_surf, (0, s), direct)
+    _scale_into(menu_surf.subsurface((mw-s, s, s, mh-s2)), (s, inner_h), big_surf, (width-s, s), direct)
+    # cache and return
+    _menu_cache[key] = (original_image, big_surf)
+    if len(_menu_cache) > MENU_CACHE_SIZE:
+        _menu_cache.popitem(False)
     return big_surf
 
 
@@ -317,12 +594,15 @@ def ease_out_circ(t: float) -> float:
 
 
 def hex_to_rgba(hex: str, a: bool = True) -> tuple[int]:
-    hex = hex.replace("#", "").strip()
-    return tuple(int(hex[i:i+2], 16) for i in (0, 2, 4)) if not a else tuple(int(hex[i:i+2], 16) for i in (0, 2, 4, 6))
+    b = bytes.fromhex(hex.replace("#", "").strip())
+    if len(b) < (4 if a else 3):
+        # same error the int() parsing gave for missing digits
+        raise ValueError(f"Hex color '{hex}' is too short")
+    return (b[0], b[1], b[2], b[3]) if a else (b[0], b[1], b[2])
     
     
 def rgba_to_hex(r,g,b,a) -> str:
-    return '#{:02x}{:02x}{:02x}'.format(r, g, b) if a is None else '#{:02x}{:02x}{:02x}{:02x}'.format(r, g, b, a)
+    return "#"+bytes((r, g, b)).hex() if a is None else "#"+bytes((r, g, b, a)).hex()
 
 
 ANIMATION_FUNCTIONS = {
@@ -345,7 +625,28 @@ ANIMATION_FUNCTIONS = {
 }
 
 
-DEFAULT_CALLBACKS: list[str] = [
+ANIMATION_FUNCTIONS_VEC = {
+    'linear': lambda t: t,
+    'ease_in': lambda t: t * t,
+    'ease_out': lambda t: t * (2 - t),
+    'ease_in_quad': lambda t: t * t,
+    'ease_out_quad': lambda t: t * (2 - t),
+    'ease_in_cubic': lambda t: t * t * t,
+    'ease_out_cubic': lambda t: 1 - (1 - t) ** 3,
+    'ease_in_quart': lambda t: t * t * t * t,
+    'ease_out_quart': lambda t: 1 - (1 - t) ** 4,
+    'ease_in_quint': lambda t: t * t * t * t * t,
+    'ease_out_quint': lambda t: 1 - (1 - t) ** 5,
+    'ease_in_sine': lambda t: 1 - numpy.cos((t * numpy.pi) / 2),
+    'ease_out_sine': lambda t: numpy.sin((t * numpy.pi) / 2),
+    'ease_in_expo': lambda t: numpy.where(t == 0, 0.0, numpy.power(2.0, 10 * (t - 1))),
+    'ease_out_expo': lambda t: numpy.where(t == 1, 1.0, 1 - numpy.power(2.0, -10 * t)),
+    'ease_out_circ': lambda t: numpy.sqrt(numpy.abs(1 - (t - 1) * (t - 1))),
+}
+ANIMATION_BATCH_MIN: int = 5
+
+
+DEFAULT_CALLBACKS: tuple[str, ...] = (
     "when_hovered",
     "when_pressed",
     "when_right_pressed",
@@ -369,7 +670,7 @@ DEFAULT_CALLBACKS: list[str] = [
     "on_resize",
     "on_drag",
     "on_text_selection_change"
-]
+)
 
 
 Z_INDEXES = {
@@ -429,6 +730,13 @@ STYLE_ANIMATION_TYPES = {
     }
 }
 
+
+# read-only views, these tables are looked up constantly and never modified
+ANIMATION_FUNCTIONS = MappingProxyType(ANIMATION_FUNCTIONS)
+Z_INDEXES = MappingProxyType(Z_INDEXES)
+STYLE_ANIMATION_TYPES = MappingProxyType(
+    {comp_name: MappingProxyType(properties) for comp_name, properties in STYLE_ANIMATION_TYPES.items()})
+
 DEFAULT_STYLE_GSS: str = """
 / BUILTIN ELEMENT TYPES
 text:: {
@@ -78,6 +78,7 @@ class UIImageComp(UIComponent):
         self.image_surf: pygame.Surface = None
         self.image_rect: pygame.Rect = None
         self.original_surface: pygame.Surface | None = None
+        self._scaled_surface: tuple[pygame.Surface, float, pygame.Surface] | None = None
         self.set_surface(None)
 
     def get_active_surface(self) -> pygame.Surface:
@@ -92,6 +93,7 @@ class UIImageComp(UIComponent):
         """Manually set the surface. This will override the style's image.image property"""
         if surface == self.original_surface and not force_update:
             return self
+        self._clear_scaled_surface()
         self.original_surface: pygame.Surface = surface
         self._build(self.element.style)
         return self
@@ -99,13 +101,23 @@ class UIImageComp(UIComponent):
     def _size_changed(self):
         self._build(self.element.style)
 
+    def _clear_scaled_surface(self):
+        if self._scaled_surface is not None:
+            common.invalidate_menu_cache(self._scaled_surface[2])
+            self._scaled_surface = None
+
+    def _get_scaled_surface(self, original_surface: pygame.Surface, scale: float) -> pygame.Surface:
+        # reuse the same scaled surface between builds so generated menu surfaces stay cached
+        if self._scaled_surface is None or self._scaled_surface[0] is not original_surface or self._scaled_surface[1] != scale:
+            self._clear_scaled_surface()
+            self._scaled_surface = (original_surface, scale, pygame.transform.scale_by(original_surface, scale))
+        return self._scaled_surface[2]
+
     def _build(self, style: UIStyle):
         original_surface = self.original_surface if self.original_surface else style.image.image
         if not original_surface:
             return
-        original_surface = original_surface.copy()
-        original_surface = pygame.transform.scale_by(
-            original_surface, style.image.border_scale)
+        original_surface = self._get_scaled_surface(original_surface, style.image.border_scale)
 
         iw, ih = original_surface.get_size()
         tw, th = max(self.element.relative_rect.w-style.image.padding*2, 5), \
@@ -146,6 +158,8 @@ class UIImageComp(UIComponent):
             w, h = self.image_surf.get_size()
         else:
             self.image_surf = original_surface
+            if style.image.fill_color is not None or style.image.alpha != 255:
+                self.image_surf = self.image_surf.copy()
         if style.image.fill_color is not None:
             self.image_surf.fill(style.image.fill_color)
         self.image_rect: pygame.Rect = pygame.Rect(0, 0, w, h)
@@ -245,6 +259,8 @@ class UITextComp(UIComponent):
         self._selection_end_idxs: list[int] = None
         self._cursor_draw_pos: pygame.Vector2 = pygame.Vector2()
         self._show_cursor: bool = False
+        self._wrap_key: tuple | None = None
+        self._wrapped_lines: tuple[list[str], list[int]] = ([], [0])
         self.set_text("")
 
     def _render(self):
@@ -276,7 +292,18 @@ class UITextComp(UIComponent):
     def _size_changed(self):
         self._build(self.element.style)
 
+    def _get_wrapped_lines(self) -> tuple[list[str], list[int]]:
+        """[Internal] Return the real text wrapped like for text selection and the prefix sums of the line lengths"""
+        font = self.element.style.text.font
+        key = (self.real_text, self.element.relative_rect.w, font)
+        if key != self._wrap_key:
+            lines = common.text_wrap_str(self.real_text, self.element.relative_rect.w, font)
+            self._wrapped_lines = (lines, common.line_len_prefix(lines))
+            self._wrap_key = key
+        return self._wrapped_lines
+
     def _build(self, style):
+        self._wrap_key = None
         text = style.text.text if style.text.text else self.text
         if text.strip() and text[-1] == "\n":
             text += " "
@@ -1,3 +1,6 @@
+import sys
+import numpy
+import operator
 import pygame
 import typing
 if typing.TYPE_CHECKING:
@@ -19,6 +22,39 @@ from .. import enums
 from .. import events
 
 
+_z_index_key = operator.attrgetter("z_index")
+# the current value animate_*_to methods compute the increase from
+_ANIM_CURRENT_VALUE: dict[AnimPropertyType, typing.Callable[["Element"], float]] = {
+    AnimPropertyType.x: operator.attrgetter("relative_rect.x"),
+    AnimPropertyType.y: operator.attrgetter("relative_rect.y"),
+    AnimPropertyType.width: operator.attrgetter("relative_rect.w"),
+    AnimPropertyType.height: operator.attrgetter("relative_rect.h"),
+    AnimPropertyType.render_x: operator.attrgetter("render_offset.x"),
+    AnimPropertyType.render_y: operator.attrgetter("render_offset.y"),
+}
+
+# shared by every element until its first anchor is set
+_NO_ANCHORS: tuple[None, ...] = (None,)*len(common.ANCHOR_NAMES)
+
+
+def _resolve_anchor_axis(low_ad: common.UIAnchorData | None, high_ad: common.UIAnchorData | None, low: int, size: int) -> tuple[int, int]:
+    """[Internal] Return the anchored start and size along one axis given the start and end anchors"""
+    if low_ad is not None:
+        low = getattr(low_ad.target.absolute_rect, low_ad.target_anchor)+low_ad.offset
+        if high_ad is None:
+            high = low+size
+    if high_ad is not None:
+        high = getattr(high_ad.target.absolute_rect, high_ad.target_anchor)+high_ad.offset
+        if low_ad is None:
+            low = high-size
+    elif low_ad is None:
+        high = low+size
+    if high <= low:
+        high = low+1
+    # truncated like pygame does when assigning to a rect
+    return int(low), int(high-low)
+
+
 class Element:
     """
     Base class for elements\n
@@ -32,6 +68,18 @@ class Element:
     manager -> the manager the element is bound to or optionally None if there is a current manager\n
     """
     need_event: bool = False
+    # '__dict__' keeps elements open to custom attributes, subclasses rely on it too
+    __slots__ = (
+        "relative_rect", "manager", "parent", "element_id", "object_id", "style_id", "element_types",
+        "children", "_children_ids", "_sorted_children", "_user_children_cache", "_destroyable_cache", "ghost_element", "_ghost_offset", "_element_surface", "_masked_surface",
+        "absolute_rect", "_absolute_topleft", "_absolute_topleft_epoch", "static_rect",
+        "ignore_stack", "ignore_scroll", "ignore_raycast", "can_destroy", "z_index",
+        "_scroll_offset", "_render_offset", "attrs", "_is_builtin", "resizers_size", "resizers", "resize_min", "resize_max",
+        "playing_animations", "_tooltip", "_tooltip_spec", "_resizers_elements", "_anchor_observers", "_anchors", "_anchor_mask",
+        "_subtree_dirty", "status", "buffers", "sounds", "_last_style", "style_group", "_style_key", "style",
+        "components", "callback_component", "bg", "image", "shape", "text", "icon", "outline",
+        "_previous_parent", "__dict__", "__weakref__"
+    )
 
     def __init__(self,
                  relative_rect: pygame.Rect,
@@ -53,30 +101,40 @@ class Element:
 
         self.parent: Element | "UIRoot" = parent or UIState.current_parent or self.manager.root
         self.manager._all_elements.append(self)
+        self.manager._all_element_ids.add(id(self))
 
         if self.relative_rect is None:
             raise UIError(
                 f"Element relative rect can't be None. Make sure to give a valid relative_rect parameter")
-        self.relative_rect = pygame.Rect(relative_rect)
+        # Rect.copy is cheaper than the generic Rect constructor
+        self.relative_rect = relative_rect.copy() if type(relative_rect) is pygame.Rect else pygame.Rect(relative_rect)
 
         if self.parent is None:
             raise UIError(
                 "Element parent can't be None. Make sure to give a valid parent parameter or set the corrent current parent")
 
         # str attrs
-        self.element_id: str = element_id
+        # ids are interned, style matching compares them against every style holder
+        self.element_id: str = sys.intern(element_id)
         self.object_id: int = id(self)
-        self.style_id: str = (
-            UIState.current_style_id+";" if UIState.current_style_id is not None else "") + style_id
-        self.element_types: tuple[str] = element_types
+        self.style_id: str = sys.intern((
+            UIState.current_style_id+";" if UIState.current_style_id is not None else "") + style_id)
+        self.element_types: tuple[str] = tuple(map(sys.intern, element_types))
 
         # attrs
         self.children: list[Element] = []
+        self._children_ids: set[int] = set()
+        # sorted and filtered views of children, rebuilt on demand after the children change
+        self._sorted_children: list[Element] | None = None
+        self._user_children_cache: list[Element] | None = None
+        self._destroyable_cache: list[Element] | None = None
         self.ghost_element: Element | None = None
-        self.ghost_offset: pygame.Vector2 = pygame.Vector2()
-        self.element_surface: pygame.Surface = pygame.Surface(
-            (max(self.relative_rect.w, 1), max(self.relative_rect.h, 1)), pygame.SRCALPHA)
+        self._ghost_offset: pygame.Vector2 | None = None
+        self._element_surface: pygame.Surface | None = None
+        self._masked_surface: pygame.Surface | None = None
         self.absolute_rect: pygame.Rect = self.relative_rect.copy()
+        self._absolute_topleft: pygame.Vector2 | None = None
+        self._absolute_topleft_epoch: int = -1
         self.static_rect: pygame.Rect = self.relative_rect.copy()
         self.ignore_stack: bool = False
         self.ignore_scroll: bool = False
@@ -84,30 +142,36 @@ class Element:
         self.can_destroy: bool = True
         
         self.z_index: int = common.Z_INDEXES["element"]
-        self.scroll_offset: pygame.Vector2 = pygame.Vector2()
-        self.render_offset: pygame.Vector2 = pygame.Vector2()
+        self._scroll_offset: pygame.Vector2 | None = None
+        self._render_offset: pygame.Vector2 | None = None
         self.attrs: dict[str] = {}
+        self._is_builtin: bool = False
         self.resizers_size: int = 5
         self.resizers: tuple[str] = ()
         self.resize_min: common.Coordinate | None = (20, 20)
         self.resize_max: common.Coordinate | None = None
         self.playing_animations: list[UIPropertyAnim] = []
-        self.tooltip: Element|None = None
+        self._tooltip: Element|None = None
+        self._tooltip_spec: tuple | None = None
         self._resizers_elements: dict[str, "Element"] = {}
         self._anchor_observers: list["Element"] = []
-        self._anchors: dict[str, common.UIAnchorData | None] = dict.fromkeys(("left", "right", "top", "bottom", "centerx", "centery"), None)
+        # indexed like common.ANCHOR_NAMES, bit i of the mask is set when anchor i is
+        self._anchors: list[common.UIAnchorData | None] = _NO_ANCHORS
+        self._anchor_mask: int = 0
 
         # obj attrs
+        # whether a descendant may still be dirty, the fake render pass skips the subtree otherwise
+        self._subtree_dirty: bool = False
         self.status: UIStatus = UIStatus(self)
         self.buffers: UIBuffers = UIBuffers(self)
         self.sounds: UISounds = UISounds(self)
         self._last_style: UIStyle = None
         self.style_group: UIStyleGroup = UIStyles.get_style_group(self)
         self.style: UIStyle = self.style_group.style
-        self.masked_surface: pygame.Surface = pygame.Surface((max(1, self.relative_rect.w-self.style.stack.mask_padding*2),
-                                                              max(1, self.relative_rect.h-self.style.stack.mask_padding*2)), pygame.SRCALPHA)
+        self._style_key: tuple | None = self._get_style_key()
 
         # components
+        # empty until every component exists, the change notifications check it
         self.components = ()
         self.callback_component: comps.UIComponent = comps.UIComponent(
             self, self.style_changed)
@@ -125,6 +189,7 @@ class Element:
         # setup
         if self.need_event:
             self.manager._event_callbacks.append(self)
+            self.manager._event_callback_ids.add(self.object_id)
         self._update_absolute_rect_pos()
         self.parent._add_child(self)
         self.init()
@@ -162,16 +227,20 @@ class Element:
 
     # children
     def _add_child(self, element: "Element") -> typing.Self:
-        if element not in self.children:
+        if element.object_id not in self._children_ids:
+            self._children_ids.add(element.object_id)
             self.children.append(element)
+            self._children_changed()
             self._refresh_stack()
             self.set_dirty()
         return self
 
     def remove_child(self, element: "Element") -> typing.Self:
         """Remove a child from the children, without destroying it"""
-        if element in self.children:
+        if element.object_id in self._children_ids:
+            self._children_ids.discard(element.object_id)
             self.children.remove(element)
+            self._children_changed()
             self._refresh_stack()
             self.set_dirty()
         return self
@@ -179,8 +248,10 @@ class Element:
     def remove_children(self, *elements: "Element") -> typing.Self:
         """Remove the specified children without destroying them"""
         for el in elements:
-            if el in self.children:
+            if el.object_id in self._children_ids:
+                self._children_ids.discard(el.object_id)
                 self.children.remove(el)
+        self._children_changed()
         self._refresh_stack()
         self.set_dirty()
         return self
@@ -196,19 +267,26 @@ class Element:
         if self.ghost_element is not None:
             self.ghost_element.destroy(True)
         self.parent.remove_child(self)
-        for child in list(self.children):
-            child.destroy(True)
+        # children remove themselves, walking backwards by index needs no copy of the list
+        children = self.children
+        for i in range(len(children)-1, -1, -1):
+            if i < len(children):
+                children[i].destroy(True)
         self.children.clear()
-        if self in self.manager._all_elements:
-            self.manager._all_elements.remove(self)
-        if self in self.manager._event_callbacks:
-            self.manager._event_callbacks.remove(self)
+        self._children_ids.clear()
+        self._children_changed()
+        common.release_surface(self._element_surface)
+        common.release_surface(self._masked_surface)
+        self._element_surface = self._masked_surface = None
+        self.manager._remove_element(self)
         del self
 
     def destroy_children(self) -> typing.Self:
         """Destroy all children of this element if the children have the 'can_destroy' flag set to True"""
-        for child in list(self.children):
-            child.destroy()
+        children = self.children
+        for i in range(len(children)-1, -1, -1):
+            if i < len(children):
+                children[i].destroy()
         self.set_dirty()
         return self
 
@@ -216,10 +294,12 @@ class Element:
         """Move this element between the parent's children"""
         if len(self.parent.children) <= 1:
             return self
-        new_idx = pygame.math.clamp(self.parent.children.index(
-            self)+places, 0, len(self.parent.children)-1)
-        self.parent.children.remove(self)
-        self.parent.children.insert(new_idx, self)
+        siblings = self.parent.children
+        new_idx, last_idx = siblings.index(self)+places, len(siblings)-1
+        new_idx = 0 if new_idx < 0 else (last_idx if new_idx > last_idx else new_idx)
+        siblings.remove(self)
+        siblings.insert(new_idx, self)
+        self._parent_children_changed()
         self.parent._refresh_stack()
         return self
     
@@ -269,6 +349,76 @@ class Element:
         UIState.current_parent = self._previous_parent
         self._refresh_stack()
 
+    # surfaces
+    @property
+    def element_surface(self) -> pygame.Surface:
+        """The surface the element renders on. Allocated the first time it's needed"""
+        # pooled surfaces aren't cleared, they are only acquired while the element is dirty and _render fills them
+        if self._element_surface is None:
+            self._element_surface = common.acquire_surface(self.relative_rect.size)
+        return self._element_surface
+
+    @element_surface.setter
+    def element_surface(self, surface: pygame.Surface):
+        self._element_surface = surface
+
+    @property
+    def masked_surface(self) -> pygame.Surface:
+        """The surface children render on when the stack mask padding is positive. Allocated the first time it's needed"""
+        mask_padding = self.style.stack.mask_padding
+        size = (max(1, self.relative_rect.w-mask_padding*2), max(1, self.relative_rect.h-mask_padding*2))
+        if self._masked_surface is None or self._masked_surface.get_size() != size:
+            common.release_surface(self._masked_surface)
+            self._masked_surface = common.acquire_surface(size)
+        return self._masked_surface
+
+    @masked_surface.setter
+    def masked_surface(self, surface: pygame.Surface):
+        self._masked_surface = surface
+
+    # offsets, the vectors are only allocated when they are first used
+    @property
+    def scroll_offset(self) -> pygame.Vector2:
+        if self._scroll_offset is None:
+            self._scroll_offset = pygame.Vector2()
+        return self._scroll_offset
+
+    @scroll_offset.setter
+    def scroll_offset(self, scroll_offset: pygame.Vector2):
+        self._scroll_offset = scroll_offset
+
+    @property
+    def render_offset(self) -> pygame.Vector2:
+        if self._render_offset is None:
+            self._render_offset = pygame.Vector2()
+        return self._render_offset
+
+    @render_offset.setter
+    def render_offset(self, render_offset: pygame.Vector2):
+        self._render_offset = render_offset
+
+    @property
+    def ghost_offset(self) -> pygame.Vector2:
+        if self._ghost_offset is None:
+            self._ghost_offset = pygame.Vector2()
+        return self._ghost_offset
+
+    @ghost_offset.setter
+    def ghost_offset(self, ghost_offset: pygame.Vector2):
+        self._ghost_offset = ghost_offset
+
+    @property
+    def tooltip(self) -> "Element | None":
+        """The tooltip element. Tooltips set with set_tooltip are built the first time they're needed"""
+        if self._tooltip_spec is not None:
+            self._build_tooltip()
+        return self._tooltip
+
+    @tooltip.setter
+    def tooltip(self, tooltip: "Element | None"):
+        self._tooltip = tooltip
+        self._tooltip_spec = None
+
     # get
     def can_render(self) -> bool:
         """Return whether the element can be rendered. If the element is not visible or outside of the parent's bounds False is returned. Can be useful not to waste performance on some operations"""
@@ -276,7 +426,16 @@ class Element:
     
     def get_absolute_topleft(self) -> pygame.Vector2:
         """Return the topleft position from the origin of the window"""
-        return pygame.Vector2(self.parent.get_absolute_topleft()+self.relative_rect.topleft)-(self.manager.root.scroll_offset if self.ignore_scroll else self.parent.scroll_offset)
+        return pygame.Vector2(self._get_absolute_topleft())
+
+    def _get_absolute_topleft(self) -> pygame.Vector2:
+        # cached until any position or scroll offset in the manager changes. internal callers
+        # read the cached vector directly and must not modify it
+        if self._absolute_topleft_epoch != self.manager._layout_epoch:
+            self._absolute_topleft = (self.parent._get_absolute_topleft()+self.relative_rect.topleft) - \
+                (self.manager.root.scroll_offset if self.ignore_scroll else self.parent.scroll_offset)
+            self._absolute_topleft_epoch = self.manager._layout_epoch
+        return self._absolute_topleft
 
     def get_attr(self, name: str):
         """Retrive a custom element attribute or None if it doesn't exist"""
@@ -287,7 +446,7 @@ class Element:
         return name in self.attrs
     
     def has_anchor(self, self_anchor: str):
-        return self_anchor in self._anchors and self._anchors[self_anchor] is not None
+        return self_anchor in common.ANCHOR_INDEXES and bool(self._anchor_mask & (1 << common.ANCHOR_INDEXES[self_anchor]))
 
     def get_index_in_parent(self) -> int:
         """Return the current index in the parent's children"""
@@ -295,7 +454,9 @@ class Element:
     
     def get_destroyable_children(self) -> list["Element"]:
         """Return a list with the children this element can destroy (that have the can_destroy flag set to True)"""
-        return [el for el in self.children if el.can_destroy]
+        if self._destroyable_cache is None:
+            self._destroyable_cache = [el for el in self.children if el.can_destroy]
+        return list(self._destroyable_cache)
 
     def is_stack(self) -> bool:
         """Return whether this is a stack element. Useful since properties like scrollbars are only accessible for stacks"""
@@ -307,12 +468,9 @@ class Element:
     
     def get_user_children(self) -> list["Element"]:
         """Return a list of children without elements added by guiscript like automatic scrollbars and resizers"""
-        res = []
-        for ch in self.children:
-            if ch.has_attr("builtin"):
-                continue
-            res.append(ch)
-        return res
+        if self._user_children_cache is None:
+            self._user_children_cache = [ch for ch in self.children if not ch._is_builtin]
+        return list(self._user_children_cache)
 
     # navigation
     def can_navigate(self) -> bool:
@@ -323,19 +481,18 @@ class Element:
         """Find a child that can be navigated between the element's children and their children"""
         if not self.can_navigate():
             return None
+        # a child that can't navigate has nothing to offer either, so only direct children are checked
         for child in self.children:
-            if child.can_navigate():
+            status = child.status
+            if status.can_navigate and status.visible:
                 return child
-            else:
-                their_child = child.find_navigable_child()
-                if their_child is not None:
-                    return their_child
         return None
 
     def has_navigable_child(self) -> bool:
         """Return whether at least one of the element's children can be navigated"""
         for child in self.children:
-            if child.can_navigate():
+            status = child.status
+            if status.can_navigate and status.visible:
                 return True
         return False
 
@@ -343,26 +500,29 @@ class Element:
         """Return how many of the element's children can be navigated"""
         count = 0
         for child in self.children:
-            if child.can_navigate():
+            status = child.status
+            if status.can_navigate and status.visible:
                 count += 1
         return count
 
     # add
     def add_element_type(self, element_type: str) -> typing.Self:
         """Add one element type to the tuple and build a new style group"""
-        self.element_types = (*self.element_types, element_type)
-        self.set_style_group(UIStyles.get_style_group(self))
+        self.element_types = (*self.element_types, sys.intern(element_type))
+        self._refresh_style_group()
         return self
 
     def add_element_types(self, *element_types: str) -> typing.Self:
         """Add multiple element types to the tuple and build a new style group"""
-        for et in element_types:
-            self.add_element_type(et)
+        self.element_types = (*self.element_types, *map(sys.intern, element_types))
+        self._refresh_style_group()
         return self
     
     def anchors_padding(self, padding: float, *skip_anchors: str) -> typing.Self:
         """Automatically set the offset of some anchors with the provided padding, inverting it for right and bottom. The specified anchors will be skipped"""
-        for na, ad in self._anchors.items():
+        if not self._anchor_mask:
+            return self
+        for na, ad in zip(common.ANCHOR_NAMES, self._anchors):
             if ad is None or na in skip_anchors:
                 continue
             if na in ["top", "left"]:
@@ -375,11 +535,14 @@ class Element:
     # remove
     def remove_anchors(self, *skip_anchors: str) -> typing.Self:
         """Remove all anchors from the element except for anchors in skip"""
-        for na, ad in list(self._anchors.items()):
+        if not self._anchor_mask:
+            return self
+        for i, (na, ad) in enumerate(zip(common.ANCHOR_NAMES, self._anchors)):
             if ad is None or na in skip_anchors:
                 continue
             ad.target._anchor_observers.remove(self)
-            self._anchors[na] = None
+            self._anchors[i] = None
+            self._anchor_mask &= ~(1 << i)
         return self
     
     def remove_resizers(self, *resizers: str) -> typing.Self:
@@ -387,8 +550,10 @@ class Element:
         old_resizers = self.resize_max
         resizers_list = list(self.resizers)
         for r in resizers:
-            if r in resizers_list:
+            try:
                 resizers_list.remove(r)
+            except ValueError:
+                pass
         self.resizers = tuple(resizers_list)
         for name, rel in list(self._resizers_elements.items()):
             if name in old_resizers and name not in self.resizers:
@@ -398,34 +563,43 @@ class Element:
 
     def remove_animations(self) -> typing.Self:
         """Set all property animations of the element to a dead state"""
-        for anim in list(self.playing_animations):
-            anim.destroy()
+        # animations started by the end callbacks are appended and left playing
+        playing_animations = self.playing_animations
+        for i in range(len(playing_animations)):
+            playing_animations[i].destroy()
 
     # set
     def set_children(self, children: list["Element"], destroy_old: bool = False) -> typing.Self:
         """Replace the current element's children with the specified ones. The old children will be destroyed following the destroy_old flag"""
-        for ch in list(self.children):
-            if ch not in children:
+        new_ids = {ch.object_id for ch in children}
+        old_children = self.children
+        for i in range(len(old_children)-1, -1, -1):
+            if i >= len(old_children):
+                continue
+            ch = old_children[i]
+            if ch.object_id not in new_ids:
                 if destroy_old:
                     ch.destroy()
                 else:
                     self.remove_child(ch)
         for ch in children:
-            if ch not in self.children:
+            if ch.object_id not in self._children_ids:
                 ch.set_parent(self)
         return self
         
     def set_user_children(self, children: list["Element"], destroy_old: bool = False) -> typing.Self:
         """Replace the current element's user children with the specified ones. The old children will be destroyed following the destroy_old flag"""
         user_children = self.get_user_children()
+        user_ids = {ch.object_id for ch in user_children}
+        new_ids = {ch.object_id for ch in children}
         for ch in user_children:
-            if ch not in children:
+            if ch.object_id not in new_ids:
                 if destroy_old:
                     ch.destroy()
                 else:
                     self.remove_child(ch)
         for ch in children:
-            if ch not in user_children:
+            if ch.object_id not in user_ids:
                 ch.set_parent(self)
         return self
     
@@ -442,14 +616,16 @@ class Element:
         NOTE: centerx and centery are not compatible with left, right and top, bottom respectively
         """
         self.set_ignore(stack=True)
-        if self_anchor not in ["left", "right", "top", "bottom", "centerx", "centery"] or target_anchor not in ["left", "right", "top", "bottom", "centerx", "centery"]:
+        if self_anchor not in common.ANCHOR_INDEXES or target_anchor not in common.ANCHOR_INDEXES:
             raise UIError(
                 f"Invalid anchor. Valid anchors are left, right, top, bottom, centerx, centery")
+        anchor_i = common.ANCHOR_INDEXES[self_anchor]
         if target is None:
-            if self._anchors[self_anchor] is not None:
-                self._anchors[self_anchor].target._anchor_observers.remove(
+            if self._anchors[anchor_i] is not None:
+                self._anchors[anchor_i].target._anchor_observers.remove(
                     self)
-            self._anchors[self_anchor] = None
+                self._anchors[anchor_i] = None
+                self._anchor_mask &= ~(1 << anchor_i)
             return self
         else:
             if self_anchor == "none" or target_anchor == "none":
@@ -460,14 +636,18 @@ class Element:
         if target.is_root():
             raise UIError("Anchor target cannot be root")
         data = common.UIAnchorData(target, self_anchor, target_anchor, offset)
-        if self._anchors[self_anchor] is not None:
-            self._anchors[self_anchor].target._anchor_observers.remove(self)
-        self._anchors[self_anchor] = data
+        if self._anchors is _NO_ANCHORS:
+            self._anchors = list(_NO_ANCHORS)
+        if self._anchors[anchor_i] is not None:
+            self._anchors[anchor_i].target._anchor_observers.remove(self)
+        self._anchors[anchor_i] = data
+        self._anchor_mask |= 1 << anchor_i
         target._anchor_observers.append(self)
-        if (self._anchors["left"] is not None or self._anchors["right"] is not None) and self._anchors["centerx"] is not None:
+        mask = self._anchor_mask
+        if mask & common.ANCHOR_X_MASK and mask & common.ANCHOR_CENTERX_BIT:
             raise UIError(
                 f"If the centerx anchor is set left and right anchors cannot be set too")
-        if (self._anchors["top"] is not None or self._anchors["bottom"] is not None) and self._anchors["centery"] is not None:
+        if mask & common.ANCHOR_Y_MASK and mask & common.ANCHOR_CENTERY_BIT:
             raise UIError(
                 f"If the centery anchor is set top and bottom anchors cannot be set too")
         self._apply_anchors()
@@ -509,14 +689,17 @@ class Element:
 
     def set_index_in_parent(self, index: int) -> typing.Self:
         """Set the current index in the parent's children"""
-        self.parent.children.remove(self)
-        self.parent.children.insert(pygame.math.clamp(
-            index, 0, len(self.parent.children)), self)
+        siblings = self.parent.children
+        siblings.remove(self)
+        last_idx = len(siblings)
+        siblings.insert(0 if index < 0 else (last_idx if index > last_idx else index), self)
+        self._parent_children_changed()
         self.parent._refresh_stack()
         return self
 
     def set_ignore(self, stack: bool | None = None, scroll: bool | None = None, raycast: bool | None = None) -> typing.Self:
         """Set the 'ignore_stack' and 'ignore_scroll' flags"""
+        self.manager._hit_generation += 1
         self.ignore_stack = stack if stack is not None else self.ignore_stack
         self.ignore_scroll = scroll if scroll is not None else self.ignore_scroll
         self.ignore_raycast = raycast if raycast is not None else self.ignore_raycast
@@ -524,49 +707,73 @@ class Element:
 
     def set_dirty(self, dirty: bool = True) -> typing.Self:
         """Change the dirty flag, usually to True. This will cause the element to re-render"""
+        self.manager._hit_generation += 1
         if dirty == self.status.dirty:
             return self
         self.status.dirty = dirty
-        self.parent.set_dirty()
+        # mark the ancestors up to the first one already dirty, the root has no flag
+        node = self.parent
+        while not node.is_root():
+            node._subtree_dirty = True
+            if node.status.dirty:
+                break
+            node.status.dirty = True
+            node = node.parent
         return self
 
     def set_can_destroy(self, can_destroy: bool) -> typing.Self:
         """Set the 'can_destroy' flag. If it is False, destroy() won't work"""
         self.can_destroy = can_destroy
+        self._parent_children_changed()
         return self
 
     def set_z_index(self, z_index: int) -> typing.Self:
         """Set the Z index used for interaction and rendering"""
+        # the parent's sorted children stay valid when the index doesn't change
+        if z_index == self.z_index:
+            return self
         self.z_index = z_index
+        self._parent_children_changed()
         self.set_dirty()
         return self
 
     def set_attr(self, name: str, value) -> typing.Self:
         """Set a custom element attribute"""
         self.attrs[name] = value
+        if name == "builtin":
+            self._set_builtin()
         return self
 
     def set_attrs(self, **names_values) -> typing.Self:
         """Set multiple custom element attributes using kwargs"""
         for name, val in names_values.items():
             self.attrs[name] = val
+        if "builtin" in names_values:
+            self._set_builtin()
         return self
 
     def set_absolute_pos(self, position: common.Coordinate, apply_anchors: bool = True) -> typing.Self:
         """Set the topleft position from the origin of the window"""
         old = self.relative_rect.topleft
-        self.relative_rect.topleft = position-self.parent.get_absolute_topleft()
+        self.relative_rect.topleft = position-self.parent._get_absolute_topleft()
         if old == self.relative_rect.topleft:
             return self
 
         self._update_absolute_rect_pos()
-        for comp in self.components:
-            comp._position_changed()
+        if self.components:
+            self.bg._position_changed()
+            self.image._position_changed()
+            self.shape._position_changed()
+            self.text._position_changed()
+            self.icon._position_changed()
+            self.outline._position_changed()
         self.position_changed()
         self.status.invoke_callbacks("on_position_change")
-        for obs in self._anchor_observers:
-            obs._apply_anchors()
-        if apply_anchors: self._apply_anchors()
+        # most elements have no anchors and nothing anchored to them
+        if self._anchor_observers:
+            self._apply_observers_anchors()
+        if apply_anchors and self._anchor_mask:
+            self._apply_anchors()
         return self
 
     def set_relative_pos(self, position: common.Coordinate) -> typing.Self:
@@ -576,13 +783,19 @@ class Element:
 
         self.relative_rect.topleft = position
         self._update_absolute_rect_pos()
-        for comp in self.components:
-            comp._position_changed()
+        if self.components:
+            self.bg._position_changed()
+            self.image._position_changed()
+            self.shape._position_changed()
+            self.text._position_changed()
+            self.icon._position_changed()
+            self.outline._position_changed()
         self.position_changed()
         self.status.invoke_callbacks("on_position_change")
-        for obs in self._anchor_observers:
-            obs._apply_anchors()
-        self._apply_anchors()
+        if self._anchor_observers:
+            self._apply_observers_anchors()
+        if self._anchor_mask:
+            self._apply_anchors()
         return self
 
     def set_size(self, size: common.Coordinate, propagate_up: bool = False, apply_anchors: bool = True, refresh_stack: bool = True) -> typing.Self:
@@ -594,16 +807,22 @@ class Element:
         self.relative_rect.size = (max(1, s0), max(1, s1))
         self._update_absolute_rect_size(propagate_up)
         self._update_surface_size()
-        for comp in self.components:
-            comp._size_changed()
+        if self.components:
+            self.bg._size_changed()
+            self.image._size_changed()
+            self.shape._size_changed()
+            self.text._size_changed()
+            self.icon._size_changed()
+            self.outline._size_changed()
         self.size_changed()
         self.build()
         self.status.invoke_callbacks("on_size_change", "on_build")
-        self._update_resizers_size()
-        
-        for obs in self._anchor_observers:
-            obs._apply_anchors()
-        if apply_anchors:
+        if self._resizers_elements:
+            self._update_resizers_size()
+
+        if self._anchor_observers:
+            self._apply_observers_anchors()
+        if apply_anchors and self._anchor_mask:
             self._apply_anchors()
         if refresh_stack: self._refresh_stack()
         return self
@@ -630,10 +849,18 @@ class Element:
 
     def set_style_group(self, style_group: UIStyleGroup) -> typing.Self:
         """Manually set the style group of the element (not recommended)"""
+        if style_group is self.style_group:
+            return self
+        self._style_key = None
         self.style_group = style_group
         self.style = self.style_group.style
-        for comp in self.components:
-            comp._style_changed()
+        if self.components:
+            self.bg._style_changed()
+            self.image._style_changed()
+            self.shape._style_changed()
+            self.text._style_changed()
+            self.icon._style_changed()
+            self.outline._style_changed()
         self.style_changed()
         self.build()
         self.status.invoke_callbacks("on_style_change", "on_build")
@@ -642,20 +869,20 @@ class Element:
 
     def set_style_id(self, style_id: str) -> typing.Self:
         """Set the style id of the element and build a new style group"""
-        self.style_id = style_id
-        self.set_style_group(UIStyles.get_style_group(self))
+        self.style_id = sys.intern(style_id)
+        self._refresh_style_group()
         return self
 
     def set_element_types(self, element_types: tuple[str]) -> typing.Self:
         """Set the element types of the element and build a new style group"""
-        self.element_types = element_types
-        self.set_style_group(UIStyles.get_style_group(self))
+        self.element_types = tuple(map(sys.intern, element_types))
+        self._refresh_style_group()
         return self
     
     def set_element_id(self, element_id: str) -> typing.Self:
         """Set the element id of the element and build a new style group"""
-        self.element_id = element_id
-        self.set_style_group(UIStyle.get_style_group(self))
+        self.element_id = sys.intern(element_id)
+        self._refresh_style_group()
         return self
     
     def set_parent(self, parent: typing.Union["Element", None]) -> typing.Self:
@@ -666,33 +893,47 @@ class Element:
             return self
         self.parent.remove_child(self)
         self.parent = parent
+        self.manager._layout_epoch += 1
         self.parent._add_child(self)
         return self
 
     def set_tooltip(self, title: str, description: str = "", width: int = 200, height: int = 200, title_h: int = 40, style_id: str = "copy", title_style_id: str = "copy", descr_style_id: str = "copy") -> typing.Self:
-        """Build a new tooltip object with the provided settings and register it"""
+        """Register a new tooltip object with the provided settings. Its elements are built the first time it's needed"""
+        # the style ids are resolved now, as they would be if the elements were built here
+        cont_style_id = (UIState.current_style_id+";" if UIState.current_style_id is not None else "") + \
+            common.style_id_or_copy(self, style_id)
+        title_style_id = cont_style_id if title_style_id == "copy" else title_style_id
+        descr_style_id = cont_style_id if descr_style_id == "copy" else descr_style_id
+        self._tooltip = None
+        self._tooltip_spec = (title, description, width, height, title_h, cont_style_id, title_style_id, descr_style_id)
+        Tooltips.register(None, self)
+        return self
+
+    def _build_tooltip(self):
+        title, description, width, height, title_h, style_id, title_style_id, descr_style_id = self._tooltip_spec
+        self._tooltip_spec = None
+        current_style_id, UIState.current_style_id = UIState.current_style_id, None
         tooltip_cont = Element(pygame.Rect(0, 0, width, height),
                                self.element_id+"tooltip_container",
-                               common.style_id_or_copy(self, style_id),
+                               style_id,
                                ("element", "tooltip", "tooltip_container"),
                                self.manager.root, self.manager).set_z_index(common.Z_INDEXES["tooltip"])
         if title:
             Element(pygame.Rect(0, 0, width, title_h),
                     self.element_id+"tooltip_title",
-                    common.style_id_or_copy(tooltip_cont, title_style_id),
+                    title_style_id,
                     ("element", "tooltip", "text",
                      "tooltip_text", "tooltip_title"),
                     tooltip_cont, self.manager).text.set_text(title).element
         Element(pygame.Rect(0, title_h if title else 0, width, height-title_h if title else height),
                 self.element_id+"tooltip_description",
-                common.style_id_or_copy(tooltip_cont, descr_style_id),
+                descr_style_id,
                 ("element", "tooltip", "text",
                  "tooltip_text", "tooltip_description"),
                 tooltip_cont, self.manager).text.set_text(description).element
-        self.tooltip = tooltip_cont
+        UIState.current_style_id = current_style_id
         tooltip_cont.hide()
-        Tooltips.register(tooltip_cont, self)
-        return self
+        self._tooltip = tooltip_cont
 
     def set_custom_tooltip(self, tooltip: "Element") -> typing.Self:
         """Register a given tooltip object to appear when hovering this element"""
@@ -730,149 +971,143 @@ class Element:
     def animate_x(self, increase: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                   ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the x coordinate"""
-        UIPropertyAnim(self, AnimPropertyType.x, increase,
-                       duration_ms, repeat_mode, ease_func_name)
-        return self
+        return self._animate((AnimPropertyType.x,), increase, duration_ms, repeat_mode, ease_func_name)
 
     def animate_offset_x(self, increase: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                          ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the x render offset coordinate"""
-        UIPropertyAnim(self, AnimPropertyType.render_x, increase,
-                       duration_ms, repeat_mode, ease_func_name)
-        return self
+        return self._animate((AnimPropertyType.render_x,), increase, duration_ms, repeat_mode, ease_func_name)
 
     def animate_y(self, increase: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                   ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the y coordinate"""
-        UIPropertyAnim(self, AnimPropertyType.y, increase,
-                       duration_ms, repeat_mode, ease_func_name)
-        return self
+        return self._animate((AnimPropertyType.y,), increase, duration_ms, repeat_mode, ease_func_name)
 
     def animate_offset_y(self, increase: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                          ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the y render offset coordinate"""
-        UIPropertyAnim(self, AnimPropertyType.render_y, increase,
-                       duration_ms, repeat_mode, ease_func_name)
-        return self
+        return self._animate((AnimPropertyType.render_y,), increase, duration_ms, repeat_mode, ease_func_name)
 
     def animate_xy(self, increase: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                    ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the x and y coordinates"""
-        UIPropertyAnim(self, AnimPropertyType.x, increase,
-                       duration_ms, repeat_mode, ease_func_name)
-        UIPropertyAnim(self, AnimPropertyType.y, increase,
-                       duration_ms, repeat_mode, ease_func_name)
-        return self
+        return self._animate((AnimPropertyType.x, AnimPropertyType.y), increase, duration_ms, repeat_mode, ease_func_name)
 
     def animate_offset_xy(self, increase: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                           ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the x and y render offset coordinates"""
-        UIPropertyAnim(self, AnimPropertyType.render_x, increase,
-                       duration_ms, repeat_mode, ease_func_name)
-        UIPropertyAnim(self, AnimPropertyType.render_y, increase,
-                       duration_ms, repeat_mode, ease_func_name)
-        return self
+        return self._animate((AnimPropertyType.render_x, AnimPropertyType.render_y), increase, duration_ms, repeat_mode, ease_func_name)
 
     def animate_w(self, increase: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                   ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the width"""
-        UIPropertyAnim(self, AnimPropertyType.width, increase,
-                       duration_ms, repeat_mode, ease_func_name)
-        return self
+        return self._animate((AnimPropertyType.width,), increase, duration_ms, repeat_mode, ease_func_name)
 
     def animate_h(self, increase: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                   ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the height"""
-        UIPropertyAnim(self, AnimPropertyType.height, increase,
-                       duration_ms, repeat_mode, ease_func_name)
-        return self
+        return self._animate((AnimPropertyType.height,), increase, duration_ms, repeat_mode, ease_func_name)
 
     def animate_wh(self, increase: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                    ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the width and height"""
-        UIPropertyAnim(self, AnimPropertyType.width, increase,
-                       duration_ms, repeat_mode, ease_func_name)
-        UIPropertyAnim(self, AnimPropertyType.height, increase,
-                       duration_ms, repeat_mode, ease_func_name)
-        return self
+        return self._animate((AnimPropertyType.width, AnimPropertyType.height), increase, duration_ms, repeat_mode, ease_func_name)
 
     def animate_x_to(self, value: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                      ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the x coordinate setting the increase relative to the current value and end value"""
-        return self.animate_x(value-self.relative_rect.x, duration_ms, repeat_mode, ease_func_name)
+        return self._animate_to((AnimPropertyType.x,), value, duration_ms, repeat_mode, ease_func_name)
 
     def animate_offset_x_to(self, value: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                             ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the x render offset coordinate setting the increase relative to the current value and end value"""
-        return self.animate_offset_x(value-self.render_offset.x, duration_ms, repeat_mode, ease_func_name)
+        return self._animate_to((AnimPropertyType.render_x,), value, duration_ms, repeat_mode, ease_func_name)
 
     def animate_y_to(self, value: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                      ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the y coordinate setting the increase relative to the current value and end value"""
-        return self.animate_y(value-self.relative_rect.y, duration_ms, repeat_mode, ease_func_name)
+        return self._animate_to((AnimPropertyType.y,), value, duration_ms, repeat_mode, ease_func_name)
 
     def animate_offset_y_to(self, value: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                             ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the y render offset coordinate setting the increase relative to the current value and end value"""
-        return self.animate_offset_y(value-self.render_offset.y, duration_ms, repeat_mode, ease_func_name)
+        return self._animate_to((AnimPropertyType.render_y,), value, duration_ms, repeat_mode, ease_func_name)
 
     def animate_xy_to(self, value: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                       ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the x and y coordinates setting the increase relative to the current value and end value"""
-        self.animate_x(value-self.relative_rect.x, duration_ms,
-                       repeat_mode, ease_func_name)
-        self.animate_y(value-self.relative_rect.y, duration_ms,
-                       repeat_mode, ease_func_name)
-        return self
+        return self._animate_to((AnimPropertyType.x, AnimPropertyType.y), value, duration_ms, repeat_mode, ease_func_name)
 
     def animate_offset_xy_to(self, value: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                              ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the x and y render offset coordinates setting the increase relative to the current value and end value"""
-        self.animate_offset_x(value-self.render_offset.x, duration_ms,
-                              repeat_mode, ease_func_name)
-        self.animate_offset_y(value-self.render_offset.y, duration_ms,
-                              repeat_mode, ease_func_name)
-        return self
+        return self._animate_to((AnimPropertyType.render_x, AnimPropertyType.render_y), value, duration_ms, repeat_mode, ease_func_name)
 
     def animate_w_to(self, value: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                      ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the width setting the increase relative to the current value and end value"""
-        return self.animate_w(value-self.relative_rect.w, duration_ms, repeat_mode, ease_func_name)
+        return self._animate_to((AnimPropertyType.width,), value, duration_ms, repeat_mode, ease_func_name)
 
     def animate_h_to(self, value: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                      ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the height setting the increase relative to the current value and end value"""
-        return self.animate_h(value-self.relative_rect.h, duration_ms, repeat_mode, ease_func_name)
+        return self._animate_to((AnimPropertyType.height,), value, duration_ms, repeat_mode, ease_func_name)
 
     def animate_wh_to(self, value: float, duration_ms: int, repeat_mode: AnimRepeatMode = AnimRepeatMode.once,
                       ease_func_name: AnimEaseFunc = AnimEaseFunc.ease_in) -> typing.Self:
         """Create a new property animation for the width and height setting the increase relative to the current value and end value"""
-        self.animate_w(value-self.relative_rect.w, duration_ms,
-                       repeat_mode, ease_func_name)
-        self.animate_h(value-self.relative_rect.h, duration_ms,
-                       repeat_mode, ease_func_name)
+        return self._animate_to((AnimPropertyType.width, AnimPropertyType.height), value, duration_ms, repeat_mode, ease_func_name)
+
+    def _animate(self, property_types: tuple[AnimPropertyType, ...], increase: float, duration_ms: int,
+                 repeat_mode: AnimRepeatMode, ease_func_name: AnimEaseFunc) -> typing.Self:
+        for property_type in property_types:
+            UIPropertyAnim(self, property_type, increase,
+                           duration_ms, repeat_mode, ease_func_name)
+        return self
+
+    def _animate_to(self, property_types: tuple[AnimPropertyType, ...], value: float, duration_ms: int,
+                    repeat_mode: AnimRepeatMode, ease_func_name: AnimEaseFunc) -> typing.Self:
+        for property_type in property_types:
+            UIPropertyAnim(self, property_type, value-_ANIM_CURRENT_VALUE[property_type](self),
+                           duration_ms, repeat_mode, ease_func_name)
         return self
 
     # update
     def _update_absolute_rect_pos(self):
-        self.absolute_rect.topleft = self.get_absolute_topleft()
+        # positions or scroll offsets changed, cached absolute toplefts are stale
+        self.manager._layout_epoch += 1
+        self._refresh_absolute_rect_pos()
+
+    def _update_children_absolute_rect_pos(self):
+        # the scroll offset moved every child, a single epoch bump covers them all
+        self.manager._layout_epoch += 1
+        self._refresh_absolute_rect_pos()
+
+    def _refresh_absolute_rect_pos(self, dirty: bool = True):
+        topleft = self._get_absolute_topleft()
+        self.absolute_rect.topleft = topleft
         self.static_rect.topleft = (0, 0)
+        # moving doesn't change what the descendants draw, only the element at the top of the
+        # moved subtree gets dirty so its parent blits it again
         for child in self.children:
-            child._update_absolute_rect_pos()
-        self.set_dirty()
+            child._refresh_absolute_rect_pos(False)
+        if dirty:
+            self.set_dirty()
 
     def _update_absolute_rect_size(self, propagate_up: bool = True):
+        self.manager._hit_generation += 1
         self.absolute_rect.size = self.relative_rect.size
         self.static_rect.size = self.relative_rect.size
         if propagate_up and not self.ignore_stack:
             self.parent._refresh_stack()
 
     def _update_surface_size(self):
-        if self.element_surface.get_size() != self.relative_rect.size:
-            self.element_surface = pygame.Surface(
-                (max(self.relative_rect.w, 1), max(self.relative_rect.h, 1)), pygame.SRCALPHA)
-            self.masked_surface: pygame.Surface = pygame.Surface((max(1, self.relative_rect.w-self.style.stack.mask_padding*2),
-                                                                  max(1, self.relative_rect.h-self.style.stack.mask_padding*2)), pygame.SRCALPHA)
+        # the surfaces are allocated again with the new size on the next render
+        if self._element_surface is not None and self._element_surface.get_size() != self.relative_rect.size:
+            common.release_surface(self._element_surface)
+            common.release_surface(self._masked_surface)
+            self._element_surface = None
+            self._masked_surface = None
         self.set_dirty()
 
     def _update_style(self):
@@ -885,10 +1120,11 @@ class Element:
         for comp in self.components:
             comp._build(self.style)
         self.style._enter()
-        self.status.invoke_callbacks(
-            "on_style_change", "on_build")
-        self._update_resizers_size()
-        self._apply_anchors()
+        self.status.invoke_callbacks("on_style_change", "on_build")
+        if self._resizers_elements:
+            self._update_resizers_size()
+        if self._anchor_mask:
+            self._apply_anchors()
 
     def _update_resizers_size(self):
         for name, rel in self._resizers_elements.items():
@@ -901,10 +1137,41 @@ class Element:
             else:
                 rel.set_size((self.resizers_size*2, self.resizers_size*2))
                 
+    def _get_style_key(self) -> tuple:
+        return (self.element_types, self.style_id, self.element_id, UIStyles.version)
+
+    def _refresh_style_group(self):
+        # the same ids and types with no new style holders would build an identical group
+        style_key = self._get_style_key()
+        if style_key == self._style_key:
+            return
+        self.set_style_group(UIStyles.get_style_group(self))
+        self._style_key = style_key
+
+    def _get_sorted_children(self) -> list["Element"]:
+        if self._sorted_children is None:
+            self._sorted_children = sorted(self.children, key=_z_index_key)
+        return self._sorted_children
+
+    def _children_changed(self):
+        self.manager._hit_generation += 1
+        self._sorted_children = None
+        self._user_children_cache = None
+        self._destroyable_cache = None
+
+    def _parent_children_changed(self):
+        self.parent._children_changed()
+
+    def _set_builtin(self):
+        # like has_attr("builtin"), the value doesn't matter
+        self._is_builtin = True
+        self._parent_children_changed()
+
     def _remove_dead_anchor(self, dead_element: "Element"):
-        for an, ad in list(self._anchors.items()):
+        for i, ad in enumerate(self._anchors):
             if ad is not None and ad.target is dead_element:
-                self._anchors[an] = None
+                self._anchors[i] = None
+                self._anchor_mask &= ~(1 << i)
                 break
             
     def _first_frame(self):
@@ -914,70 +1181,78 @@ class Element:
         self.status.invoke_callback("on_first_frame", "on_position_change", "on_build")
         
     def _apply_anchors(self):
-        if all([x is None for x in self._anchors.values()]):
+        if not self._anchor_mask:
             return
-        temp_r = self.absolute_rect.copy()
-        if (cxad := self._anchors["centerx"]) is not None:
-            temp_r.centerx = getattr(
-                cxad.target.absolute_rect, cxad.target_anchor)+cxad.offset
+        lad, rad, tad, bad, cxad, cyad = self._anchors
+        # plain ints instead of a rect copy, centering matches pygame's centerx/centery setters
+        x, y, w, h = self.absolute_rect
+        if cxad is not None:
+            x = int(getattr(
+                cxad.target.absolute_rect, cxad.target_anchor)+cxad.offset)-w//2
         else:
-            left, right = None, None
-            if (lad := self._anchors["left"]) is not None:
-                left = getattr(lad.target.absolute_rect,
-                               lad.target_anchor)+lad.offset
-            if (rad := self._anchors["right"]) is not None:
-                right = getattr(rad.target.absolute_rect,
-                                rad.target_anchor)+rad.offset
-            if right is None and left is not None:
-                right = left+self.absolute_rect.w
-            elif left is None and right is not None:
-                left = right-self.absolute_rect.w
-            elif left is None and right is None:
-                left, right = self.absolute_rect.left, self.absolute_rect.right
-            if right <= left:
-                right = left+1
-            temp_r.left = left
-            temp_r.width = right-left
-        if (cyad := self._anchors["centery"]) is not None:
-            temp_r.centery = getattr(
-                cyad.target.absolute_rect, cyad.target_anchor)+cyad.offset
+            x, w = _resolve_anchor_axis(lad, rad, x, w)
+        if cyad is not None:
+            y = int(getattr(
+                cyad.target.absolute_rect, cyad.target_anchor)+cyad.offset)-h//2
         else:
-            top, bottom = None, None
-            if (tad := self._anchors["top"]) is not None:
-                top = getattr(tad.target.absolute_rect,
-                              tad.target_anchor)+tad.offset
-            if (bad := self._anchors["bottom"]) is not None:
-                bottom = getattr(bad.target.absolute_rect,
-                                 bad.target_anchor)+bad.offset
-            if bottom is None and top is not None:
-                bottom = top+self.absolute_rect.h
-            elif top is None and bottom is not None:
-                top = bottom-self.absolute_rect.h
-            elif top is None and bottom is None:
-                top, bottom = self.absolute_rect.top, self.absolute_rect.bottom
-            if bottom <= top:
-                bottom = top+1
-            temp_r.top = top
-            temp_r.height = bottom-top
-        self.set_size(temp_r.size, apply_anchors=False)
-        self.set_absolute_pos(temp_r.topleft, apply_anchors=False)
+            y, h = _resolve_anchor_axis(tad, bad, y, h)
+        self._set_anchored_rect((x, y), (w, h))
+
+    def _set_anchored_rect(self, topleft: common.Coordinate, size: common.Coordinate):
+        self.set_size(size, apply_anchors=False)
+        self.set_absolute_pos(topleft, apply_anchors=False)
+
+    def _apply_observers_anchors(self):
+        observers = self._anchor_observers
+        # without numba the batch is slower than the loop at any size, compiled it only breaks even from ~100 observers
+        if not common.NUMBA_AVAILABLE or len(observers) < common.ANCHOR_BATCH_MIN:
+            for obs in observers:
+                obs._apply_anchors()
+            return
+        # observers anchored only to this element don't affect each other and are resolved together
+        batch, others = [], []
+        for obs in dict.fromkeys(observers):
+            if all(ad is None or ad.target is self for ad in obs._anchors):
+                batch.append(obs)
+            else:
+                others.append(obs)
+        if len(batch) < common.ANCHOR_BATCH_MIN:
+            for obs in observers:
+                obs._apply_anchors()
+            return
+        abs_rect = self.absolute_rect
+        target_values = numpy.array([getattr(abs_rect, name) for name in common.ANCHOR_NAMES], numpy.float64)
+        anchor_idx = numpy.full((len(batch), 6), -1, numpy.int8)
+        offsets = numpy.zeros((len(batch), 6), numpy.float64)
+        for i, obs in enumerate(batch):
+            for j, ad in enumerate(obs._anchors):
+                if ad is not None:
+                    anchor_idx[i, j] = ad.target_anchor_idx
+                    offsets[i, j] = ad.offset
+        rects = numpy.array([obs.absolute_rect for obs in batch], numpy.float64)
+        new_rects = common.resolve_anchor_rects(target_values, anchor_idx, offsets, rects).tolist()
+        for obs, (x, y, w, h) in zip(batch, new_rects):
+            obs._set_anchored_rect((x, y), (w, h))
+        for obs in others:
+            obs._apply_anchors()
         
     # runtime
     def _logic(self):
-        if not self.status.visible:
+        status = self.status
+        if not status.visible:
             return
         if self.ghost_element is not None:
             self.set_relative_pos((self.ghost_element.relative_rect.centerx-self.relative_rect.w // 2+self.ghost_offset.x,
                                    self.ghost_element.relative_rect.centery-self.relative_rect.h//2+self.ghost_offset.y))
-        for child in sorted(self.children, key=lambda el: el.z_index):
+        for child in self._get_sorted_children():
             child._logic()
             
         style: UIStyle = None
-        if not self.status.active:
+        if not status.active:
             style = self.style_group.style
-        elif self.status.pressed or self.status.selected:
+        elif status.pressed or status.selected:
             style = self.style_group.press_style
-        elif self.status.hovered:
+        elif status.hovered:
             style = self.style_group.hover_style
         else:
             style = self.style_group.style
@@ -986,7 +1261,9 @@ class Element:
             self._update_style()
             self._last_style = style
         
-        self.style._logic()
+        # most styles have no animations, skip the call for them
+        if self.style.animations:
+            self.style._logic()
         if self.style.dirty:
             for comp in self.components:
                 comp._build(self.style)
@@ -996,7 +1273,7 @@ class Element:
             self.build()
             self.status.invoke_callbacks("on_style_change", "on_build")
             
-        if len(self._resizers_elements) > 0 and UIState.mouse_rel.length() > 0:
+        if UIState.mouse_moved and self._resizers_elements:
             for name, rel in self._resizers_elements.items():
                 if rel.status.pressed:
                     xi = yi = pxi = pyi = 0
@@ -1016,11 +1293,19 @@ class Element:
                     if rmx is None:
                         rmx = (float("inf"), float("inf"))
                     old_x, old_y = self.relative_rect.size
-                    new_size = (pygame.math.clamp(self.relative_rect.w+xi, rmn[0], rmx[0]),
-                                   pygame.math.clamp(self.relative_rect.h+yi, rmn[1], rmx[1]))
-                    if old_x == new_size[0]:
+                    new_w, new_h = old_x+xi, old_y+yi
+                    if new_w < rmn[0]:
+                        new_w = rmn[0]
+                    elif new_w > rmx[0]:
+                        new_w = rmx[0]
+                    if new_h < rmn[1]:
+                        new_h = rmn[1]
+                    elif new_h > rmx[1]:
+                        new_h = rmx[1]
+                    new_size = (new_w, new_h)
+                    if old_x == new_w:
                         pxi = 0
-                    if old_y == new_size[1]:
+                    if old_y == new_h:
                         pyi = 0
                     if pxi != 0 or pyi != 0:
                         self.set_relative_pos(
@@ -1028,55 +1313,78 @@ class Element:
                     self.set_size(new_size, True)
                     self.status.invoke_callback("on_resize")
                     events._post_base_event(events.RESIZE, self)
-        if self.status.can_drag and self.status.pressed:
-            self.status.dragging = True
-            if UIState.mouse_rel.length() > 0:
+        if status.can_drag and status.pressed:
+            status.dragging = True
+            if UIState.mouse_moved:
                 self.set_relative_pos((self.relative_rect.x+UIState.mouse_rel.x, self.relative_rect.y+UIState.mouse_rel.y))
-                self.status.invoke_callback("on_drag")
+                status.invoke_callback("on_drag")
                 events._post_base_event(events.DRAG, self)
         else:
-            self.status.dragging = False
+            status.dragging = False
 
         self.on_logic()
 
-    def _render(self, parent_mask_padding: int = 0, force_render: bool = False, fake: bool = False):
+    def _render(self, parent_mask_padding: int = 0, force_render: bool = False, fake: bool = False, blits: list | None = None):
         if not self.status.visible or (not self.status.dirty and not force_render):
             return
         if not self.absolute_rect.colliderect(self.parent.absolute_rect):
             return
         if fake:
             self.manager._last_rendered = self
-            for child in self.children:
-                child._render(fake=True)
+            if self._subtree_dirty:
+                for child in self.children:
+                    child._render(fake=True)
             return
 
         if self.status.dirty:
             mask_padding = self.style.stack.mask_padding
             self.manager._last_rendered = self
-            self.element_surface.fill(0)
+            element_surface = self.element_surface
+            element_surface.fill(0)
             if mask_padding > 0:
-                self.masked_surface.fill(0)
-
-            for i, comp in enumerate(self.components):
-                if i == len(self.components)-1:
-                    for child in sorted(self.children, key=lambda el: el.z_index):
-                        child._render(mask_padding, True)
-                    if mask_padding > 0:
-                        self.element_surface.blit(
-                            self.masked_surface, (mask_padding, mask_padding))
-                if comp.enabled:
-                    comp._render()
+                masked_surface = self.masked_surface
+                masked_surface.fill(0)
+
+            components = self.components
+            if components:
+                *under, last = components
+                for comp in under:
+                    if comp.enabled:
+                        comp._render()
+                # children go under the last component, their surfaces are added with a single fblits call
+                child_blits = []
+                for child in self._get_sorted_children():
+                    child._render(mask_padding, True, blits=child_blits)
+                # children skipped as hidden or out of view stay dirty
+                self._subtree_dirty = any(child.status.dirty or child._subtree_dirty for child in self.children)
+                if mask_padding > 0:
+                    if child_blits:
+                        masked_surface.fblits(child_blits)
+                    element_surface.blit(
+                        masked_surface, (mask_padding, mask_padding))
+                elif child_blits:
+                    element_surface.fblits(child_blits)
+                if last.enabled:
+                    last._render()
 
             self.on_render()
         else:
             self.manager._last_rendered = self
-            for child in self.children:
-                child._render(fake=True)
+            if self._subtree_dirty:
+                for child in self.children:
+                    child._render(fake=True)
         if parent_mask_padding <= 0:
-            self.parent.element_surface.blit(self.element_surface, self.relative_rect.topleft -
-                                             (self.manager.root.scroll_offset if self.ignore_scroll else self.parent.scroll_offset)+self.render_offset)
+            dest = self.relative_rect.topleft - \
+                (self.manager.root.scroll_offset if self.ignore_scroll else self.parent.scroll_offset)
+        else:
+            dest = self.relative_rect.topleft - (pygame.Vector2(parent_mask_padding, parent_mask_padding)) - \
+                (self.manager.root.scroll_offset if self.ignore_scroll else self.parent.scroll_offset)
+        if self._render_offset is not None:
+            dest += self._render_offset
+        if blits is not None:
+            blits.append((self.element_surface, dest))
+        elif parent_mask_padding <= 0:
+            self.parent.element_surface.blit(self.element_surface, dest)
         else:
-            self.parent.masked_surface.blit(self.element_surface, self.relative_rect.topleft -
-                                            (pygame.Vector2(parent_mask_padding, parent_mask_padding)) -
-                                            (self.manager.root.scroll_offset if self.ignore_scroll else self.parent.scroll_offset)+self.render_offset)
+            self.parent.masked_surface.blit(self.element_surface, dest)
         self.status.dirty = False
@@ -122,8 +122,10 @@ class Textbox(VStack):
                 self.set_scroll(self.scroll_offset.x,
                     self.scroll_offset.y-self.text_element.style.text.font.get_height())
         
-        if pygame.time.get_ticks()-self._last_blink >= self.settings.blink_speed and self.is_focused():
-            self._last_blink = pygame.time.get_ticks()
+        # one clock read for the blink and the key repeat
+        now = pygame.time.get_ticks()
+        if now-self._last_blink >= self.settings.blink_speed and self.is_focused():
+            self._last_blink = now
             if self.text_element.text._show_cursor:
                 self.text_element.text._show_cursor = False
             else:
@@ -136,20 +138,19 @@ class Textbox(VStack):
 
         if self._repeat_key is None:
             return
-        if pygame.time.get_ticks() - self._action_start_time >= self.settings.repeat_start_cooldown:
-            if pygame.time.get_ticks() - self._last_repeat >= self.settings.repeat_speed:
+        if now - self._action_start_time >= self.settings.repeat_start_cooldown:
+            if now - self._last_repeat >= self.settings.repeat_speed:
                 if UIState.keys_pressed[self._repeat_key]:
                     if self._repeat_data is not None:
                         self._repeat_func(self._repeat_data)
                     else:
                         self._repeat_func()
-                    self._last_repeat = pygame.time.get_ticks()
+                    self._last_repeat = now
                 else:
                     self._repeat_key = None
                     
     def _start_repeat(self, key, func, data=None):
-        self._action_start_time = pygame.time.get_ticks()
-        self._last_repeat = pygame.time.get_ticks()
+        self._action_start_time = self._last_repeat = pygame.time.get_ticks()
         self._repeat_key, self._repeat_func, self._repeat_data = key, func, data
         
     def _get_lines(self):
@@ -1,10 +1,16 @@
 import pygame
 import typing
+import operator
 
 from ..error import UIError
 from .element import Element
 
 
+# returned by _get_absolute_topleft, callers never modify it
+_ORIGIN: pygame.Vector2 = pygame.Vector2(0, 0)
+_z_index_key = operator.attrgetter("z_index")
+
+
 class UIRoot:
     """The root element for elements bound to a Manager. It's a simplified version of Element. Automatically created by Manager"""
 
@@ -20,19 +26,27 @@ class UIRoot:
         self.status: UIRoot.UIRootStatus = UIRoot.UIRootStatus()
         self.scroll_offset = pygame.Vector2()
         self.children: list[Element] = []
+        self._children_ids: set[int] = set()
+        self._sorted_children: list[Element] | None = None
+        # the root isn't bound to its manager, raycasts check this besides the manager's generation
+        self._children_version: int = 0
         self.ignore_raycast: bool = False
 
     def _refresh_stack(self):
         ...
 
     def _add_child(self, element: Element) -> typing.Self:
+        self._children_ids.add(element.object_id)
         self.children.append(element)
+        self._children_changed()
         return self
 
     def remove_child(self, element: Element) -> typing.Self:
         """Remove a child from the children, without destroying it"""
-        if element in self.children:
+        if element.object_id in self._children_ids:
+            self._children_ids.discard(element.object_id)
             self.children.remove(element)
+            self._children_changed()
         return self
 
     def set_screen_surface(self, screen_surface: pygame.Surface) -> typing.Self:
@@ -59,14 +73,29 @@ class UIRoot:
         for child in self.children:
             child._logic()
 
+    def _get_sorted_children(self) -> list[Element]:
+        if self._sorted_children is None:
+            self._sorted_children = sorted(self.children, key=_z_index_key)
+        return self._sorted_children
+
+    def _children_changed(self):
+        self._children_version += 1
+        self._sorted_children = None
+
     def _render(self):
-        for child in sorted(self.children, key=lambda el: el.z_index):
-            child._render(0, True)
+        blits = []
+        for child in self._get_sorted_children():
+            child._render(0, True, blits=blits)
+        if blits:
+            self.element_surface.fblits(blits)
 
     def get_absolute_topleft(self) -> pygame.Vector2:
         """Return an empty pygame.Vector2"""
         return pygame.Vector2(0, 0)
 
+    def _get_absolute_topleft(self) -> pygame.Vector2:
+        return _ORIGIN
+
     def is_stack(self) -> typing.Literal[False]:
         """Always return False"""
         return False
@@ -82,18 +111,16 @@ class UIRoot:
     def find_navigable_child(self) -> "Element":
         """Find a child that can be navigated between the element's children and their children"""
         for child in self.children:
-            if child.can_navigate():
+            status = child.status
+            if status.can_navigate and status.visible:
                 return child
-            else:
-                their_child = child.find_navigable_child()
-                if their_child is not None:
-                    return their_child
         return None
 
     def has_navigable_child(self) -> bool:
         """Return whether at least one of the element's children can be navigated"""
         for child in self.children:
-            if child.can_navigate():
+            status = child.status
+            if status.can_navigate and status.visible:
                 return True
         return False
 
@@ -101,12 +128,15 @@ class UIRoot:
         """Return how many of the element's children can be navigated"""
         count = 0
         for child in self.children:
-            if child.can_navigate():
+            status = child.status
+            if status.can_navigate and status.visible:
                 count += 1
         return count
 
     def destroy_children(self) -> typing.Self:
         """Destroy all children of this element if the children have the 'can_destroy' flag set to True"""
-        for child in list(self.children):
-            child.destroy()
+        children = self.children
+        for i in range(len(children)-1, -1, -1):
+            if i < len(children):
+                children[i].destroy()
         return self
@@ -16,6 +16,10 @@ class UIScrollbar(Element):
         self.handle: Element = Element(pygame.Rect(
             0, 0, 10, 10), self.element_id+"_handle", self.style_id, ("element", "handle", "scrollbar_handle", f"{scrollbar_dir_prefix}scrollbar_handle"), self, self.manager)
         self._is_custom: bool = False
+        # what the geometry was last computed from, it's only set again when that changes
+        self._geometry_key: tuple | None = None
+        # every input of _refresh the last time it ran, the stack refreshes far more often than they change
+        self._refresh_key: tuple | None = None
         
     def _refresh(self):
         ...
@@ -28,38 +32,56 @@ class UIVScrollbar(UIScrollbar):
         super().__init__(stack, style_id, "v")
 
     def _refresh(self, scroll_y):
-        style = self.parent.style.stack
+        # the rects are updated in place, binding them once is safe
+        parent, status = self.parent, self.status
+        style = parent.style.stack
+        parent_rect, rect = parent.relative_rect, self.relative_rect
+        scrollbar_size = style.scrollbar_size
+
+        refresh_key = (scroll_y, parent.total_y, parent.content_y, parent.scroll_offset.y, parent_rect.size, rect.h, scrollbar_size,
+                       style.scroll_y, style.grow_y, self._is_custom, self.manager.min_scroll_handle_size, status.visible)
+        if refresh_key == self._refresh_key:
+            return
+        self._refresh_key = refresh_key
+        self.manager._hit_generation += 1
 
         if not self._is_custom:
-            self.set_relative_pos(
-                (self.parent.relative_rect.w-style.scrollbar_size, 0))
-            self.set_size(
-                (style.scrollbar_size, self.parent.relative_rect.h), False)
+            geometry_key = (parent_rect.w, parent_rect.h, scrollbar_size)
+            if geometry_key != self._geometry_key:
+                self._geometry_key = geometry_key
+                self.set_relative_pos(
+                    (parent_rect.w-scrollbar_size, 0))
+                self.set_size(
+                    (scrollbar_size, parent_rect.h), False)
 
         if not style.scroll_y or style.grow_y:
-            self.status.visible = False
+            status.visible = False
             return
-        if self.parent.total_y <= self.parent.relative_rect.h:
-            if self.parent.scroll_offset.y != 0:
-                self.parent.scroll_offset.y = 0
+        total_y = parent.total_y
+        if total_y <= parent_rect.h:
+            scroll_offset = parent.scroll_offset
+            if scroll_offset.y != 0:
+                scroll_offset.y = 0
                 self.handle.set_relative_pos((0, 0))
-                for child in self.parent.children:
-                    child._update_absolute_rect_pos()
-            self.status.visible = False
+                parent._update_children_absolute_rect_pos()
+            status.visible = False
             return
 
-        self.status.visible = True
+        status.visible = True
 
-        handle_y = (self.relative_rect.h*(self.relative_rect.h -
-                    scroll_y))/(self.parent.content_y+0.000001)
-        self.handle.set_size((style.scrollbar_size, max(min(
-            handle_y, self.relative_rect.h), self.manager.min_scroll_handle_size)), False)
-        if self.parent.total_y != 0:
-            self.handle.set_relative_pos((0, (self.relative_rect.h/self.parent.total_y)*self.parent.scroll_offset.y))
+        h = rect.h
+        handle_y = (h*(h-scroll_y))/(parent.content_y+0.000001)
+        self.handle.set_size((scrollbar_size, max(min(
+            handle_y, h), self.manager.min_scroll_handle_size)), False)
+        if total_y != 0:
+            self.handle.set_relative_pos((0, (h/total_y)*parent.scroll_offset.y))
 
     def on_logic(self):
         if not self.status.visible or not self.parent.status.scroll_hovered:
             return
+        # the handle can only move when dragged or with the wheel
+        if not self.handle.status.pressed and not UIState.mouse_wheel.y:
+            return
 
         prev_y = self.handle.relative_rect.y
 
@@ -80,8 +102,7 @@ class UIVScrollbar(UIScrollbar):
         if self.handle.relative_rect.y != prev_y:
             self.parent.scroll_offset.y = (
                 self.handle.relative_rect.y*(self.parent.content_y-self.parent.style.stack.scrollbar_size))/self.relative_rect.h
-            for child in self.parent.children:
-                child._update_absolute_rect_pos()
+            self.parent._update_children_absolute_rect_pos()
             self.status.invoke_callback("on_move")
 
 
@@ -91,39 +112,64 @@ class UIHScrollbar(UIScrollbar):
     def __init__(self, stack: Element, style_id: str):
         super().__init__(stack, style_id, "h")
 
+    def _is_needed(self) -> bool:
+        """[Internal] Return whether the scrollbar is visible after the next refresh, which doesn't depend on its argument"""
+        parent = self.parent
+        style = parent.style.stack
+        return bool(style.scroll_x) and not style.grow_x and parent.total_x > parent.relative_rect.w
+
     def _refresh(self, scroll_x):
-        style = self.parent.style.stack
+        # the rects are updated in place, binding them once is safe
+        parent, status = self.parent, self.status
+        style = parent.style.stack
+        parent_rect, rect = parent.relative_rect, self.relative_rect
+        scrollbar_size = style.scrollbar_size
+        v_visible = parent.vscrollbar.status.visible
+
+        refresh_key = (scroll_x, parent.total_x, parent.content_x, parent.scroll_offset.x, parent_rect.size, rect.w, scrollbar_size,
+                       style.scroll_x, style.grow_x, self._is_custom, self.manager.min_scroll_handle_size, status.visible, v_visible)
+        if refresh_key == self._refresh_key:
+            return
+        self._refresh_key = refresh_key
+        self.manager._hit_generation += 1
 
         if not self._is_custom:
-            x_remove = style.scrollbar_size if self.parent.vscrollbar.status.visible else 0
-            self.set_relative_pos(
-                (0, self.parent.relative_rect.h-style.scrollbar_size))
-            self.set_size((self.parent.relative_rect.w -
-                        x_remove, style.scrollbar_size), False)
+            x_remove = scrollbar_size if v_visible else 0
+            geometry_key = (parent_rect.w, parent_rect.h, scrollbar_size, x_remove)
+            if geometry_key != self._geometry_key:
+                self._geometry_key = geometry_key
+                self.set_relative_pos(
+                    (0, parent_rect.h-scrollbar_size))
+                self.set_size((parent_rect.w -
+                            x_remove, scrollbar_size), False)
 
         if not style.scroll_x or style.grow_x:
-            self.status.visible = False
+            status.visible = False
             return
-        if self.parent.total_x <= self.parent.relative_rect.w:
-            if self.parent.scroll_offset.x != 0:
-                self.parent.scroll_offset.x = 0
+        total_x = parent.total_x
+        if total_x <= parent_rect.w:
+            scroll_offset = parent.scroll_offset
+            if scroll_offset.x != 0:
+                scroll_offset.x = 0
                 self.handle.set_relative_pos((0, 0))
-                for child in self.parent.children:
-                    child._update_absolute_rect_pos()
-            self.status.visible = False
+                parent._update_children_absolute_rect_pos()
+            status.visible = False
             return
-        self.status.visible = True
+        status.visible = True
 
-        handle_x = (self.relative_rect.w*(self.relative_rect.w -
-                    scroll_x))/(self.parent.content_x+0.000001)
+        w = rect.w
+        handle_x = (w*(w-scroll_x))/(parent.content_x+0.000001)
         self.handle.set_size(
-            (max(min(handle_x, self.relative_rect.w), self.manager.min_scroll_handle_size), style.scrollbar_size), False)
-        if self.parent.total_x != 0:
-            self.handle.set_relative_pos(((self.relative_rect.w/self.parent.total_x)*self.parent.scroll_offset.x, 0))
+            (max(min(handle_x, w), self.manager.min_scroll_handle_size), scrollbar_size), False)
+        if total_x != 0:
+            self.handle.set_relative_pos(((w/total_x)*parent.scroll_offset.x, 0))
 
     def on_logic(self):
         if not self.status.visible or not self.parent.status.scroll_hovered:
             return
+        # the handle can only move when dragged or with the wheel
+        if not self.handle.status.pressed and not UIState.mouse_wheel.x and not UIState.mouse_wheel.y:
+            return
 
         prev_x = self.handle.relative_rect.x
 
@@ -152,6 +198,5 @@ class UIHScrollbar(UIScrollbar):
                 max(self.relative_rect.w-self.handle.relative_rect.w, 0.0001)
             self.parent.scroll_offset.x = (
                 handle_x*(self.parent.content_x-x_add/2))/self.relative_rect.w
-            for child in self.parent.children:
-                child._update_absolute_rect_pos()
+            self.parent._update_children_absolute_rect_pos()
             self.status.invoke_callback("on_move")
@@ -20,17 +20,67 @@ class UIStack(Element):
                  stack_dir_prefix: str = "v"
                  ):
         self._done = False
+        # state of the last layout that left everything unchanged, see _get_layout_key
+        self._layout_key: tuple | None = None
         super().__init__(relative_rect, element_id, style_id, ("element", "stack", f"{stack_dir_prefix}stack"), parent,
                          manager)
         self.content_x: int = 0
         self.content_y: int = 0
         self.total_x: int = 0
         self.total_y: int = 0
-        self.vscrollbar: UIVScrollbar = UIVScrollbar(self, scrollbars_style_id).set_attr("builtin", True)
-        self.hscrollbar: UIHScrollbar = UIHScrollbar(self, scrollbars_style_id).set_attr("builtin", True)
+        # the builtin scrollbars are made when the stack first overflows or when they are accessed
+        self._scrollbars_style_id: str = scrollbars_style_id
+        self._vscrollbar: UIVScrollbar | None = None
+        self._hscrollbar: UIHScrollbar | None = None
         self._done = True
         self.deactivate()
-        
+
+    @property
+    def vscrollbar(self) -> UIVScrollbar:
+        if self._vscrollbar is None:
+            self._build_scrollbars()
+        return self._vscrollbar
+
+    @vscrollbar.setter
+    def vscrollbar(self, vscrollbar: UIVScrollbar):
+        if self._vscrollbar is None:
+            self._build_scrollbars()
+        self._vscrollbar = vscrollbar
+
+    @property
+    def hscrollbar(self) -> UIHScrollbar:
+        if self._hscrollbar is None:
+            self._build_scrollbars()
+        return self._hscrollbar
+
+    @hscrollbar.setter
+    def hscrollbar(self, hscrollbar: UIHScrollbar):
+        if self._hscrollbar is None:
+            self._build_scrollbars()
+        self._hscrollbar = hscrollbar
+
+    def _build_scrollbars(self):
+        """[Internal] Create both builtin scrollbars"""
+        done = self._done
+        self._done = False
+        self._vscrollbar = UIVScrollbar(self, self._scrollbars_style_id).set_attr("builtin", True)
+        self._hscrollbar = UIHScrollbar(self, self._scrollbars_style_id).set_attr("builtin", True)
+        # first like when they were made with the stack, the order breaks z index ties and is read by the layout
+        children = self.children
+        children[:] = children[-2:]+children[:-2]
+        self._children_changed()
+        self._done = done
+
+    def _scrollbars_needed(self) -> bool:
+        """[Internal] Return whether the scrollbars have to be refreshed, building them the first time they can show up"""
+        if self._vscrollbar is None:
+            # the scrollbars get their visibility from the totals of the previous layout, with these they would stay hidden
+            rect, scroll_offset = self.relative_rect, self.scroll_offset
+            if self.total_x <= rect.w and self.total_y <= rect.h and not scroll_offset.x and not scroll_offset.y:
+                return False
+            self._build_scrollbars()
+        return True
+
     def bind_hscrollbar(self, hscrollbar: UIHScrollbar) -> typing.Self:
         """Register a new horizontal scrollbar and destroy the old one. The scrollbar must be made with guiscript.custom_hscrollbar for it to work properly"""
         self._done = False
@@ -38,7 +88,7 @@ class UIStack(Element):
         self.hscrollbar = hscrollbar
         self._done = True
         return self
-    
+
     def bind_vscrollbar(self, vscrollbar: UIVScrollbar) -> typing.Self:
         """Register a new vertical scrollbar and destroy the old one. The scrollbar must be made with guiscript.custom_vscrollbar for it to work properly"""
         self._done = False
@@ -50,24 +100,46 @@ class UIStack(Element):
     def is_stack(self) -> bool:
         return True
 
+    def _get_layout_key(self) -> tuple:
+        """[Internal] Return everything _refresh_stack reads and writes. A layout that didn't change it is skipped the next time it's the same"""
+        stack_style = self.style.stack
+        vscrollbar, hscrollbar = self._vscrollbar, self._hscrollbar
+        scrollbars = None if vscrollbar is None else (
+            vscrollbar, vscrollbar.status.visible, vscrollbar._is_custom, tuple(vscrollbar.relative_rect), tuple(vscrollbar.handle.relative_rect),
+            hscrollbar, hscrollbar.status.visible, hscrollbar._is_custom, tuple(hscrollbar.relative_rect), tuple(hscrollbar.handle.relative_rect))
+        return (
+            tuple(self.relative_rect), tuple(self.scroll_offset), self.total_x, self.total_y, self.content_x, self.content_y,
+            stack_style.padding, stack_style.spacing, stack_style.anchor, stack_style.shrink_x, stack_style.shrink_y,
+            stack_style.grow_x, stack_style.grow_y, stack_style.scroll_x, stack_style.scroll_y,
+            stack_style.floating_scrollbars, stack_style.scrollbar_size, self.manager.min_scroll_handle_size,
+            scrollbars,
+            tuple((child, child.ignore_stack, child.status.visible, tuple(child.relative_rect),
+                   child.style.stack.fill_x, child.style.stack.fill_y, child.style.stack.align) for child in self.children)
+        )
+
     def set_scroll(self, pixels_x: int, pixels_y: int) -> typing.Self:
         """Set the scroll offset and update the children position"""
-        self.scroll_offset.x = pygame.math.clamp(pixels_x, 0, self.total_x)
-        self.scroll_offset.y = pygame.math.clamp(pixels_y, 0, self.total_y)
-        for child in self.children:
-            child._update_absolute_rect_pos()
-        self.vscrollbar._refresh(self.total_y-self.content_y)
-        self.hscrollbar._refresh(self.total_x-self.content_x)
+        total_x, total_y = self.total_x, self.total_y
+        x = 0 if pixels_x < 0 else (total_x if pixels_x > total_x else pixels_x)
+        y = 0 if pixels_y < 0 else (total_y if pixels_y > total_y else pixels_y)
+        self._apply_scroll(x, y)
         return self
 
     def scroll_to(self, x: float = 0, y: float = 0) -> typing.Self:
         """Set the scroll offset relative to the content size, where x and y are in range 0-1"""
-        self.scroll_offset = pygame.Vector2(self.content_x*x, self.content_y*y)
-        for child in self.children:
-            child._update_absolute_rect_pos()
-        self.vscrollbar._refresh(self.total_y-self.content_y)
-        self.hscrollbar._refresh(self.total_x-self.content_x)
+        self._apply_scroll(self.content_x*x, self.content_y*y)
         return self
+
+    def _apply_scroll(self, x: float, y: float):
+        """[Internal] Set the scroll offset in place, update the children position and refresh the scrollbars"""
+        scroll_offset = self.scroll_offset
+        # the children are already in place when the offset doesn't change
+        if scroll_offset.x != x or scroll_offset.y != y:
+            scroll_offset.x, scroll_offset.y = x, y
+            self._update_children_absolute_rect_pos()
+        if self._scrollbars_needed():
+            self._vscrollbar._refresh(self.total_y-self.content_y)
+            self._hscrollbar._refresh(self.total_x-self.content_x)
     
     def __enter__(self, *args):
         self._done = False
@@ -96,65 +168,72 @@ class VStack(UIStack):
     def _refresh_stack(self):
         if not self.manager._running or not self._done:
             return
+        layout_key = self._get_layout_key()
+        if layout_key == self._layout_key:
+            return
 
-        style = self.style
+        # set_size changes the rects in place, binding them once is safe
+        stack_style = self.style.stack
+        padding = stack_style.padding
+        rect = self.relative_rect
         total_x = 0
-        total_y = style.stack.padding
-
+        total_y = padding
+
+        children = self.children
+        # the stacked children with what both passes read from them
+        active = [(child, child.style.stack, child.relative_rect) for child in children
+                  if not child.ignore_stack and child.status.visible]
+        # spacing is added before every child but the first of the list, even if that one isn't stacked.
+        # the builtin scrollbars go first, also when they aren't made yet
+        lead = children[0] if children and self._vscrollbar is not None else None
         active_children_num = 0
         children_with_fill_y: list[Element] = []
-        for i, child in enumerate(self.children):
-            if child.ignore_stack or not child.status.visible:
-                continue
-            if child.relative_rect.w > total_x and not child.style.stack.fill_x:
-                total_x = child.relative_rect.w
-            if child.style.stack.fill_y:
+        for child, child_stack, child_rect in active:
+            if child_rect.w > total_x and not child_stack.fill_x:
+                total_x = child_rect.w
+            if child_stack.fill_y:
                 active_children_num += 1
                 children_with_fill_y.append(child)
                 continue
-            if i > 0:
-                total_y += style.stack.spacing
-            total_y += child.relative_rect.h
+            if child is not lead:
+                total_y += stack_style.spacing
+            total_y += child_rect.h
             active_children_num += 1
 
-        total_y += style.stack.padding
-        total_x += style.stack.padding * 2
+        total_y += padding
+        total_x += padding * 2
 
         old_total_y = total_y
-        if len(children_with_fill_y) > 0 and total_y < self.relative_rect.h:
-            total_y = self.relative_rect.h
+        if len(children_with_fill_y) > 0 and total_y < rect.h:
+            total_y = rect.h
 
-        if (total_x < self.relative_rect.w and style.stack.shrink_x) or \
-                (total_x > self.relative_rect.w and style.stack.grow_x):
-            self.set_size((total_x, self.relative_rect.h))
+        if (total_x < rect.w and stack_style.shrink_x) or \
+                (total_x > rect.w and stack_style.grow_x):
+            self.set_size((total_x, rect.h))
 
         self.content_x = total_x
         self.content_y = total_y
 
-        if style.stack.floating_scrollbars:
+        if not self._scrollbars_needed():
             scroll_x = scroll_y = 0
-            self.vscrollbar._refresh(0)
-            self.hscrollbar._refresh(0)
+        elif stack_style.floating_scrollbars:
+            scroll_x = scroll_y = 0
+            self._vscrollbar._refresh(0)
+            self._hscrollbar._refresh(0)
         else:
-            self.vscrollbar._refresh(0)
-            scroll_x = 0
-            if self.vscrollbar.status.visible:
-                scroll_x = style.stack.scrollbar_size
-            scroll_y = 0
-            self.hscrollbar._refresh(scroll_x)
-            if self.hscrollbar.status.visible:
-                scroll_y = style.stack.scrollbar_size
-                self.vscrollbar._refresh(scroll_y)
-                if self.vscrollbar.status.visible:
-                    scroll_x = style.stack.scrollbar_size
-                    self.hscrollbar._refresh(scroll_x)
+            # the visibility of the scrollbars doesn't depend on the space left for each other,
+            # knowing the horizontal one in advance makes one refresh each enough
+            scroll_y = stack_style.scrollbar_size if self._hscrollbar._is_needed() else 0
+            self._vscrollbar._refresh(scroll_y)
+            scroll_x = stack_style.scrollbar_size if self._vscrollbar.status.visible else 0
+            self._hscrollbar._refresh(scroll_x)
 
         self.total_x = self.content_x+scroll_x
         self.total_y = self.content_y+scroll_y
 
         if len(children_with_fill_y) > 0:
-            space_available = self.relative_rect.h-old_total_y-scroll_y
-            space_available -= style.stack.spacing * \
+            space_available = rect.h-old_total_y-scroll_y
+            space_available -= stack_style.spacing * \
                 (len(children_with_fill_y)-1)
             if space_available < 0:
                 space_available = 0
@@ -162,52 +241,51 @@ class VStack(UIStack):
             for child in children_with_fill_y:
                 child.set_size((child.relative_rect.w, space_for_each_child))
 
-        spacing = style.stack.spacing
-        if style.stack.anchor == "max_spacing":
-            if total_y < self.relative_rect.h-scroll_y:
-                remaining = self.relative_rect.h-scroll_y-total_y
-                total_y = self.relative_rect.h-scroll_y
+        spacing = stack_style.spacing
+        if stack_style.anchor == "max_spacing":
+            if total_y < rect.h-scroll_y:
+                remaining = rect.h-scroll_y-total_y
+                total_y = rect.h-scroll_y
                 spacing = remaining/(max(active_children_num-1, 1)) + \
-                    style.stack.padding/(max(active_children_num-1, 1))
+                    padding/(max(active_children_num-1, 1))
 
         current_y = 0
-        if total_y < (self.relative_rect.h-scroll_y):
-            if style.stack.shrink_y:
-                self.set_size((self.relative_rect.w, total_y), True, refresh_stack=False)
+        if total_y < (rect.h-scroll_y):
+            if stack_style.shrink_y:
+                self.set_size((rect.w, total_y), True, refresh_stack=False)
             else:
-                match style.stack.anchor:
+                match stack_style.anchor:
                     case "center":
-                        current_y = (self.relative_rect.h -
+                        current_y = (rect.h -
                                      scroll_y)//2-total_y//2
                     case "bottom" | "right":
-                        current_y = (self.relative_rect.h-scroll_y)-total_y
-        elif total_y > self.relative_rect.h and style.stack.grow_y:
-            self.set_size((self.relative_rect.w, total_y), True, refresh_stack=False)
-        current_y += style.stack.padding
-
-        i_o = 0
-        for i, child in enumerate(self.children):
-            if child.ignore_stack or not child.status.visible:
-                i_o += 1
-                continue
-            if i > i_o:
+                        current_y = (rect.h-scroll_y)-total_y
+        elif total_y > rect.h and stack_style.grow_y:
+            self.set_size((rect.w, total_y), True, refresh_stack=False)
+        current_y += padding
+
+        available_w = rect.w-scroll_x
+        for i, (child, child_stack, child_rect) in enumerate(active):
+            if i > 0:
                 current_y += spacing
-            child_x = style.stack.padding
-            if not child.style.stack.fill_x:
-                if child.relative_rect.w < (self.relative_rect.w-scroll_x):
-                    match child.style.stack.align:
+            child_x = padding
+            if not child_stack.fill_x:
+                if child_rect.w < available_w:
+                    match child_stack.align:
                         case "center":
-                            child_x = (self.relative_rect.w-scroll_x)//2 - \
-                                child.relative_rect.w//2
+                            child_x = available_w//2 - \
+                                child_rect.w//2
                         case "right" | "bottom":
-                            child_x = (self.relative_rect.w-scroll_x) - \
-                                child.relative_rect.w-style.stack.padding
+                            child_x = available_w - \
+                                child_rect.w-padding
             else:
                 child.set_size(
-                    (self.relative_rect.w-style.stack.padding*2-scroll_x, child.relative_rect.h))
+                    (available_w-padding*2, child_rect.h))
             child.set_relative_pos((child_x, current_y))
-            current_y += child.relative_rect.h
+            current_y += child_rect.h
 
+        # only a layout that changed nothing is known to do nothing again
+        self._layout_key = layout_key if self._get_layout_key() == layout_key else None
 
 class Box(VStack):
     """A vertical container (direction doesn't really matter) that is supposed to contain only 1 user child (not enforced) with shortcuts to access and change it"""
@@ -252,111 +330,117 @@ class HStack(UIStack):
     def _refresh_stack(self):
         if not self.manager._running or not self._done:
             return
-        style = self.style
-        total_x = style.stack.padding
+        layout_key = self._get_layout_key()
+        if layout_key == self._layout_key:
+            return
+        # set_size changes the rects in place, binding them once is safe
+        stack_style = self.style.stack
+        padding = stack_style.padding
+        rect = self.relative_rect
+        total_x = padding
         total_y = 0
 
+        children = self.children
+        # the stacked children with what both passes read from them
+        active = [(child, child.style.stack, child.relative_rect) for child in children
+                  if not child.ignore_stack and child.status.visible]
+        # spacing is added before every child but the first of the list, even if that one isn't stacked.
+        # the builtin scrollbars go first, also when they aren't made yet
+        lead = children[0] if children and self._vscrollbar is not None else None
         active_children_num = 0
         children_with_fill_x: list[Element] = []
-        for i, child in enumerate(self.children):
-            if child.ignore_stack or not child.status.visible:
-                continue
-
-            if child.relative_rect.h > total_y and not child.style.stack.fill_y:
-                total_y = child.relative_rect.h
-            if child.style.stack.fill_x:
+        for child, child_stack, child_rect in active:
+            if child_rect.h > total_y and not child_stack.fill_y:
+                total_y = child_rect.h
+            if child_stack.fill_x:
                 active_children_num += 1
                 children_with_fill_x.append(child)
                 continue
-            if i > 0:
-                total_x += style.stack.spacing
-            total_x += child.relative_rect.w
+            if child is not lead:
+                total_x += stack_style.spacing
+            total_x += child_rect.w
             active_children_num += 1
 
-        total_x += style.stack.padding
-        total_y += style.stack.padding * 2
+        total_x += padding
+        total_y += padding * 2
 
         old_total_x = total_x
-        if len(children_with_fill_x) > 0 and total_x < self.relative_rect.w:
-            total_x = self.relative_rect.w
+        if len(children_with_fill_x) > 0 and total_x < rect.w:
+            total_x = rect.w
 
-        if (total_y < self.relative_rect.h and style.stack.shrink_y) or \
-                (total_y > self.relative_rect.h and style.stack.grow_y):
-            self.set_size((self.relative_rect.w, total_y))
+        if (total_y < rect.h and stack_style.shrink_y) or \
+                (total_y > rect.h and stack_style.grow_y):
+            self.set_size((rect.w, total_y))
 
         self.content_x = total_x
         self.content_y = total_y
 
-        if style.stack.floating_scrollbars:
+        if not self._scrollbars_needed():
+            scroll_x = scroll_y = 0
+        elif stack_style.floating_scrollbars:
             scroll_x = scroll_y = 0
-            self.vscrollbar._refresh(0)
-            self.hscrollbar._refresh(0)
+            self._vscrollbar._refresh(0)
+            self._hscrollbar._refresh(0)
         else:
-            self.vscrollbar._refresh(0)
-            scroll_x = 0
-            if self.vscrollbar.status.visible:
-                scroll_x = style.stack.scrollbar_size
-            scroll_y = 0
-            self.hscrollbar._refresh(scroll_x)
-            if self.hscrollbar.status.visible:
-                scroll_y = style.stack.scrollbar_size
-                self.vscrollbar._refresh(scroll_y)
-                if self.vscrollbar.status.visible:
-                    scroll_x = style.stack.scrollbar_size
-                    self.hscrollbar._refresh(scroll_x)
+            # the visibility of the scrollbars doesn't depend on the space left for each other,
+            # knowing the horizontal one in advance makes one refresh each enough
+            scroll_y = stack_style.scrollbar_size if self._hscrollbar._is_needed() else 0
+            self._vscrollbar._refresh(scroll_y)
+            scroll_x = stack_style.scrollbar_size if self._vscrollbar.status.visible else 0
+            self._hscrollbar._refresh(scroll_x)
 
         self.total_x = self.content_x+scroll_x
         self.total_y = self.content_y+scroll_y
 
         if len(children_with_fill_x) > 0:
-            space_available = self.relative_rect.w-old_total_x-scroll_x
-            space_available -= style.stack.spacing * \
+            space_available = rect.w-old_total_x-scroll_x
+            space_available -= stack_style.spacing * \
                 (len(children_with_fill_x)-1)
             space_for_each_child = space_available/len(children_with_fill_x)
             for child in children_with_fill_x:
                 child.set_size((space_for_each_child, child.relative_rect.h))
 
-        spacing = style.stack.spacing
-        if style.stack.anchor == "max_spacing":
-            if total_x < self.relative_rect.w-scroll_x:
-                remaining = self.relative_rect.w-scroll_x-total_x
-                total_x = self.relative_rect.w-scroll_x
+        spacing = stack_style.spacing
+        if stack_style.anchor == "max_spacing":
+            if total_x < rect.w-scroll_x:
+                remaining = rect.w-scroll_x-total_x
+                total_x = rect.w-scroll_x
                 spacing = remaining/(max(active_children_num-1, 1)) + \
-                    style.stack.padding/(max(active_children_num-1, 1))
+                    padding/(max(active_children_num-1, 1))
 
-        current_x = style.stack.padding
-        if total_x < (self.relative_rect.w-scroll_x):
-            if style.stack.shrink_x:
-                self.set_size((total_x, self.relative_rect.h))
+        current_x = padding
+        if total_x < (rect.w-scroll_x):
+            if stack_style.shrink_x:
+                self.set_size((total_x, rect.h))
             else:
-                match style.stack.anchor:
+                match stack_style.anchor:
                     case "center":
-                        current_x = (self.relative_rect.w -
+                        current_x = (rect.w -
                                      scroll_x)//2-total_x//2
                     case "right" | "bottom":
-                        current_x = (self.relative_rect.w-scroll_x)-total_x
-        elif total_x > self.relative_rect.w and style.stack.grow_x:
-            self.set_size((total_x, self.relative_rect.h))
-
-        i_o = 0
-        for i, child in enumerate(self.children):
-            if child.ignore_stack or not child.status.visible:
-                i_o += 1
-                continue
-            if i > i_o:
+                        current_x = (rect.w-scroll_x)-total_x
+        elif total_x > rect.w and stack_style.grow_x:
+            self.set_size((total_x, rect.h))
+
+        available_h = rect.h-scroll_y
+        for i, (child, child_stack, child_rect) in enumerate(active):
+            if i > 0:
                 current_x += spacing
-            child_y = style.stack.padding
-            if not child.style.stack.fill_y:
-                if child.relative_rect.h < (self.relative_rect.h-scroll_y):
-                    match child.style.stack.align:
+            child_y = padding
+            if not child_stack.fill_y:
+                if child_rect.h < available_h:
+                    match child_stack.align:
                         case "center":
-                            child_y = (self.relative_rect.h-scroll_y)//2 - \
-                                child.relative_rect.h//2
+                            child_y = available_h//2 - \
+                                child_rect.h//2
                         case "bottom" | "right":
-                            child_y = (self.relative_rect.h-scroll_y) - \
-                                child.relative_rect.h-style.stack.padding
+                            child_y = available_h - \
+                                child_rect.h-padding
             else:
                 child.set_size(
-                    (child.relative_rect.w, self.relative_rect.h-style.stack.padding*2))
+                    (child_rect.w, rect.h-padding*2))
             child.set_relative_pos((current_x, child_y))
-            current_x += child.relative_rect.w
+            current_x += child_rect.w
+
+        # only a layout that changed nothing is known to do nothing again
+        self._layout_key = layout_key if self._get_layout_key() == layout_key else None
@@ -125,7 +125,7 @@ class Window(Element):
             return
         self.move_on_top()
         self.status.dragging = True
-        if UIState.mouse_rel.length() <= 0:
+        if not UIState.mouse_moved:
             return
         self.set_relative_pos(
             (self.relative_rect.x+UIState.mouse_rel.x, self.relative_rect.y+UIState.mouse_rel.y))
@@ -194,15 +194,17 @@ class Window(Element):
         return self
 
     def on_destroy(self):
-        if self in _WinStackHolder.window_stack:
+        try:
             _WinStackHolder.window_stack.remove(self)
+        except ValueError:
+            pass
 
     def build(self):
         self.title_bar.set_size(
             (self.relative_rect.w-self.style.stack.padding*2, self.settings.title_bar_height))
         self.title_bar.anchors_padding(self.style.stack.padding)
         self.content.anchors_padding(self.style.stack.padding, "top")
-        self.content._anchors["top"].offset = self.style.stack.spacing
+        self.content._anchors[common.ANCHOR_INDEXES["top"]].offset = self.style.stack.spacing
 
 
 class FileDialog(Window):
@@ -299,8 +301,10 @@ class FileDialog(Window):
             self._on_enter_click()
         
     def _on_selectionlist_deselect(self, sl, option):
-        if option in self._options_selected:
+        try:
             self._options_selected.remove(option)
+        except ValueError:
+            pass
         
     def _on_cancel_click(self):
         self.status.invoke_callback("on_cancel")
@@ -111,7 +111,7 @@ def help_element_types() -> typing.LiteralString:
 
 def help_z_index() -> dict[str, int]:
     """Provide a help dictionary with default z index value for built in elements"""
-    return common.Z_INDEXES
+    return dict(common.Z_INDEXES)
 
 
 def help_style_script() -> typing.LiteralString:
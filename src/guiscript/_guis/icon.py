@@ -19,8 +19,10 @@ def _download_add(name: str, url: str, is_async: bool = False):
     image = pygame.image.load(io.BytesIO(response.content)).convert_alpha()
     Icons.icons[name] = image
     if is_async:
-        if name in Icons.adding_async:
+        try:
             Icons.adding_async.remove(name)
+        except ValueError:
+            pass
         for icon_comp in Icons.rebuild_async:
             icon_comp._build(icon_comp.element.style)
 
@@ -20,6 +20,10 @@ class UIInteract:
         self._pressed_el: Element = None
         self._right_pressed_el: Element = None
         self._last_scroll_hovered: Element = None
+        # position, start parent, generations and result of the last hover raycast
+        self._raycast_cache: tuple | None = None
+        # what was last passed to pygame.mouse.set_cursor
+        self._last_cursor: common.CursorLike | None = None
 
         self._start_idxs: list[int] = None
         self._last_idxs: list[int] = None
@@ -48,13 +52,13 @@ class UIInteract:
 
         # TEXT SELECTION
         if self._text_select_el is not None and self._start_idxs is not None:
-            lines = common.text_wrap_str(self._text_select_el.text.real_text, self._text_select_el.relative_rect.w, self._text_select_el.style.text.font)
+            lines, line_len_prefix = self._text_select_el.text._get_wrapped_lines()
             
             if UIState.mouse_pressed[0]:
                 end_idxs_info = common.text_click_idx(lines, self._text_select_el.style.text.font, UIState.mouse_pos, self._text_select_el.text.text_rect,
-                                                      pygame.Vector2(self._text_select_el.absolute_rect.topleft))
+                                                      self._text_select_el.absolute_rect.topleft, line_len_prefix)
                 if end_idxs_info is not None:
-                    char_i, line_i, tot_i, raw_text = end_idxs_info
+                    char_i, line_i, tot_i, _ = end_idxs_info
                     self._last_idxs = [char_i, line_i, tot_i]
                     if self._text_select_el.text._selection_end_idxs != self._last_idxs:
                         self._text_select_el.text._selection_end_idxs = self._last_idxs
@@ -62,7 +66,7 @@ class UIInteract:
 
             if self._last_idxs is not None:
                 select_rects = common.text_select_rects(self._start_idxs[1], self._start_idxs[0], self._last_idxs[1], self._last_idxs[0],
-                                                        lines, self._text_select_el.style.text.font, self._text_select_el.text.text_rect, UIState.mouse_rel.length() != 0)
+                                                        lines, self._text_select_el.style.text.font, self._text_select_el.text.text_rect, UIState.mouse_moved)
                 if UIState.mouse_pressed[0]:
                     if self._last_idxs[-2] > self._start_idxs[-2] or self._last_idxs[-3] > self._start_idxs[-3]:
                         self._text_select_el.text.set_cursor_index(self._last_idxs[-3]+1, self._last_idxs[-2])
@@ -126,7 +130,7 @@ class UIInteract:
             if self._hovered_el is not None:
                 self._hovered_el.status.hovered = False
                 old = self._hovered_el
-                self._hovered_el = self.raycast(UIState.mouse_pos, last_rendered.parent if last_rendered else None, True)
+                self._hovered_el = self._cached_raycast(last_rendered.parent if last_rendered else None)
                 
                 if old is not self._hovered_el:
                     old.status.invoke_callback("on_stop_hover")
@@ -139,7 +143,7 @@ class UIInteract:
                 else:
                     self._hovered_el.status.hovered = True
             else:
-                self._hovered_el = self.raycast(UIState.mouse_pos, last_rendered.parent if last_rendered else None, True)
+                self._hovered_el = self._cached_raycast(last_rendered.parent if last_rendered else None)
             # HOVERING
             if self._hovered_el is not None:
                 # start hover
@@ -177,53 +181,83 @@ class UIInteract:
 
         # CURSORS
         if self.manager.cursors.do_override_cursor:
-            if self._hovered_el is not None and self._hovered_el.status.active:
-                if (rn := self._hovered_el.get_attr("resizer_name")) is not None:
-                    if rn in self.manager.cursors.resize_cursors:
-                        pygame.mouse.set_cursor(self.manager.cursors.resize_cursors[rn])
-                else:
-                    pygame.mouse.set_cursor(self.manager.cursors.hover_cursor)
+            self._update_cursor()
+        else:
+            self._last_cursor = None
+
+    def _update_cursor(self):
+        cursors = self.manager.cursors
+        if self._hovered_el is not None and self._hovered_el.status.active:
+            if (rn := self._hovered_el.get_attr("resizer_name")) is not None:
+                if rn not in cursors.resize_cursors:
+                    return
+                cursor = cursors.resize_cursors[rn]
             else:
-                pygame.mouse.set_cursor(self.manager.cursors.default_cursor)
+                cursor = cursors.hover_cursor
+        else:
+            cursor = cursors.default_cursor
+        # the cursor stays until changed, setting it again every frame is wasted work
+        if cursor != self._last_cursor:
+            pygame.mouse.set_cursor(cursor)
+            self._last_cursor = cursor
 
-    def raycast(self, position: common.Coordinate, start_parent: Element, can_recurse_above=False) -> Element | None:
-        """Find the hovered element at a certain position. Extra arguments are used for recursion. Keyboard navigated elements have priority"""
+    def _cached_raycast(self, start_parent: Element | None) -> Element | None:
         if self.manager.navigation.tabbed_element is not None:
             return self.manager.navigation.tabbed_element
-        if start_parent is None or not start_parent.status.visible:
-            return
-        if (not start_parent.absolute_rect.collidepoint(position) or start_parent.ignore_raycast) and can_recurse_above:
-            return self.raycast(position, start_parent.parent, True)
+        manager = self.manager
+        position = UIState.mouse_pos
+        key = (position.x, position.y, start_parent, manager._hit_generation, manager._layout_epoch, manager.root._children_version)
+        cache = self._raycast_cache
+        if cache is not None and cache[0] == key:
+            return cache[1]
+        result = self.raycast(position, start_parent, True)
+        self._raycast_cache = (key, result)
+        return result
 
-        for rev_child in reversed(sorted(start_parent.children, key=lambda el: el.z_index)):
-            if not rev_child.absolute_rect.collidepoint(position) or not rev_child.status.visible or rev_child.ignore_raycast:
+    def raycast(self, position: common.Coordinate, start_parent: Element, can_recurse_above=False) -> Element | None:
+        """Find the hovered element at a certain position. If can_recurse_above is True the parents are searched when start_parent has no hit. Keyboard navigated elements have priority"""
+        if self.manager.navigation.tabbed_element is not None:
+            return self.manager.navigation.tabbed_element
+        node = start_parent
+        while node is not None and node.status.visible:
+            if can_recurse_above and (not node.absolute_rect.collidepoint(position) or node.ignore_raycast):
+                node = node.parent
                 continue
-            if len(rev_child.children) > 0:
-                res = self.raycast(position, rev_child)
-                if res and res.status.visible:
-                    return res
-            return rev_child
+            hit = self._raycast_children(position, node)
+            if hit is not None or not can_recurse_above:
+                return hit
+            node = node.parent
 
-        if can_recurse_above:
-            return self.raycast(position, start_parent.parent, True)
+    def _raycast_children(self, position: common.Coordinate, element: Element) -> Element | None:
+        # walk down through the topmost hit child until one has no children or no hit
+        hit = None
+        while True:
+            for rev_child in reversed(element._get_sorted_children()):
+                if rev_child.absolute_rect.collidepoint(position) and rev_child.status.visible and not rev_child.ignore_raycast:
+                    break
+            else:
+                return hit
+            hit = element = rev_child
+            if not rev_child.children:
+                return hit
 
     def _event(self, event: pygame.Event):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_c and event.mod & pygame.KMOD_CTRL:
                 if self._text_select_el is not None and self._start_idxs is not None and self._last_idxs is not None:
-                    lines = common.text_wrap_str(self._text_select_el.text.real_text,
-                                                 self._text_select_el.relative_rect.w,
-                                                 self._text_select_el.style.text.font)
+                    lines = self._text_select_el.text._get_wrapped_lines()[0]
                     common.text_select_copy(
                         self._start_idxs[1], self._start_idxs[0], self._last_idxs[1], self._last_idxs[0], lines)
 
     def _find_scroll_hovered(self, element: Element):
-        if element.is_stack() and (element.vscrollbar.status.visible or element.hscrollbar.status.visible):
-            element.status.scroll_hovered = True
-            self._last_scroll_hovered = element
-            return
-        if element.parent is not None:
-            self._find_scroll_hovered(element.parent)
+        while element is not None:
+            # stacks that never overflowed have no scrollbars yet
+            if element.is_stack() and element._vscrollbar is not None and \
+                    (element._vscrollbar.status.visible or element._hscrollbar.status.visible):
+                element.status.scroll_hovered = True
+                self._last_scroll_hovered = element
+                return
+            element = element.parent
 
     def _text_select_start_press(self, element: Element):
         if not element.text.can_select:
@@ -232,15 +266,14 @@ class UIInteract:
             self._text_select_el.text.selection_rects = []
             self._text_select_el.set_dirty()
         self._text_select_el = None
-        if not (txt := element.text.real_text):
+        if not element.text.real_text:
             return
-        lines = common.text_wrap_str(
-            txt, element.relative_rect.w, element.style.text.font)
+        lines, line_len_prefix = element.text._get_wrapped_lines()
         idxs_info = common.text_click_idx(lines, element.style.text.font, UIState.mouse_pos, element.text.text_rect,
-                                          pygame.Vector2(element.absolute_rect.topleft))
+                                          element.absolute_rect.topleft, line_len_prefix)
         if idxs_info is None:
             return
-        char_i, line_i, tot_i, raw_text = idxs_info
+        char_i, line_i, tot_i, _ = idxs_info
         self._text_select_el = element
         self._start_idxs = [char_i, line_i, tot_i]
         self._text_select_el.text._selection_start_idxs = self._start_idxs
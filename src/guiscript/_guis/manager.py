@@ -41,8 +41,15 @@ class Manager:
 
         self._running: bool = False
         self._all_elements: list[Element] = []
+        self._all_element_ids: set[int] = set()
+        self._dead_elements: int = 0
         self._last_rendered: Element = None
         self._event_callbacks: list[Element] = []
+        self._event_callback_ids: set[int] = set()
+        self._dead_event_callbacks: int = 0
+        self._layout_epoch: int = 0
+        # bumped by anything that can change what a raycast hits besides positions
+        self._hit_generation: int = 0
         self.cursors: UICursors = UICursors(self)
         self.interact: UIInteract = UIInteract(self)
         self.navigation: UINavigation = UINavigation(self)
@@ -73,8 +80,26 @@ class Manager:
     def _running_check(self):
         if not self._running:
             self._running = True
+            ids = self._all_element_ids
             for el in list(self._all_elements):
-                el._first_frame()
+                if el.object_id in ids:
+                    el._first_frame()
+
+    def _remove_element(self, element: Element):
+        # destroyed elements stay in the lists until enough of them pile up, the id sets tell which are alive.
+        # the lists keep the dead elements referenced so their ids can't be reused meanwhile
+        if element.object_id in self._all_element_ids:
+            self._all_element_ids.discard(element.object_id)
+            self._dead_elements += 1
+            if self._dead_elements > len(self._all_elements)//4:
+                self._all_elements = [el for el in self._all_elements if el.object_id in self._all_element_ids]
+                self._dead_elements = 0
+        if element.object_id in self._event_callback_ids:
+            self._event_callback_ids.discard(element.object_id)
+            self._dead_event_callbacks += 1
+            if self._dead_event_callbacks > len(self._event_callbacks)//4:
+                self._event_callbacks = [el for el in self._event_callbacks if el.object_id in self._event_callback_ids]
+                self._dead_event_callbacks = 0
 
     def event(self, event: pygame.Event) -> typing.Self:
         """Pass events to elements and to interaction and keyboard navigation"""
@@ -85,8 +110,10 @@ class Manager:
             UIState.any_pressed = True
         elif event.type == pygame.KEYUP:
             UIState.any_pressed = False
+        ids = self._event_callback_ids
         for el in self._event_callbacks:
-            el.on_event(event)
+            if el.object_id in ids:
+                el.on_event(event)
         self.interact._event(event)
         self.navigation._event(event)
         return self
@@ -132,22 +159,28 @@ class Manager:
 
     def get_with_element_id(self, element_id: str) -> Element | None:
         """Return the element with the given id"""
+        ids = self._all_element_ids
         for el in self._all_elements:
-            if el.element_id == element_id:
+            if el.element_id == element_id and el.object_id in ids:
                 return el
 
     def get_with_style_id(self, style_id: str) -> typing.Generator[Element, typing.Any, typing.Any]:
         """Return (as a generator) all elements that match the given style id"""
+        ids = self._all_element_ids
         for el in self._all_elements:
+            if el.object_id not in ids:
+                continue
             if el.style_id == style_id or ";"+style_id+";" in el.style_id or el.style_id.endswith(";"+style_id) or el.style_id.startswith(style_id+";"):
                 yield el
 
     def get_with_element_type(self, element_type: str) -> typing.Generator[Element, typing.Any, typing.Any]:
         """Return (as a generator) all elements that have the given element type"""
+        ids = self._all_element_ids
         for el in self._all_elements:
-            if element_type in el.element_types:
+            if element_type in el.element_types and el.object_id in ids:
                 yield el
 
     def get_all_elements(self) -> list[Element]:
         """Return all the elements as a list. Modifying it won't affect the manager's elements"""
-        return list(self._all_elements)
+        ids = self._all_element_ids
+        return [el for el in self._all_elements if el.object_id in ids]
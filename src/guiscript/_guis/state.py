@@ -15,6 +15,8 @@ class UIState:
     mouse_wheel: pygame.Vector2 = pygame.Vector2()
     mouse_pos: pygame.Vector2 = pygame.Vector2()
     mouse_rel: pygame.Vector2 = pygame.Vector2()
+    # set with mouse_rel, read by the per element checks instead of its length
+    mouse_moved: bool = False
     mouse_pressed: tuple[bool, bool, bool] = pygame.mouse.get_pressed()
     keys_pressed = pygame.key.get_pressed()
     just_pressed = pygame.key.get_just_pressed()
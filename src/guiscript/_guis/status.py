@@ -74,9 +74,12 @@ class UIStatus:
 
     def invoke_callback(self, name: str, *args) -> typing.Self:
         """Invoke all functions registered to the given callback name. Callbacks will be called passing the element and the invoker args. If the function takes no arguments the element will not be passed"""
-        if not name in self.callbacks:
+        # most callbacks have no listeners, the lists are checked as they are now so listeners
+        # appended to them directly are called too
+        callbacks = self.callbacks.get(name)
+        if not callbacks:
             return self
-        for callback in self.callbacks[name]:
+        for callback in callbacks:
             try:
                 callback(self.element, *args)
             except TypeError as e:
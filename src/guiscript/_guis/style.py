@@ -1,6 +1,7 @@
 import pygame
 import typing
 import pathlib
+import itertools
 if typing.TYPE_CHECKING:
     from .elements.element import Element
 
@@ -12,6 +13,8 @@ from . import enums
 
 class UICompStyle:
     """Base style class for element components"""
+    # '__dict__' keeps the styles open to custom attributes
+    __slots__ = ("enabled", "__dict__")
 
     def __init__(self, enabled: bool):
         self.enabled: bool = enabled
@@ -25,6 +28,10 @@ class UICompStyle:
 
 class UIStackStyle:
     """Style class for stacks-like elements"""
+    __slots__ = (
+        "spacing", "padding", "scroll_x", "scroll_y", "grow_x", "grow_y", "shrink_x", "shrink_y", "fill_x", "fill_y",
+        "floating_scrollbars", "anchor", "align", "scrollbar_size", "mask_padding", "__dict__"
+    )
 
     def __init__(self):
         self.spacing: int = 4
@@ -52,6 +59,7 @@ class UIStackStyle:
 
 class UIBGStyle(UICompStyle):
     """Style class for the background element component"""
+    __slots__ = ("color", "border_radius")
 
     def __init__(self):
         super().__init__(True)
@@ -61,6 +69,10 @@ class UIBGStyle(UICompStyle):
 
 class UIImageStyle(UICompStyle):
     """Style class for the image element component"""
+    __slots__ = (
+        "image", "padding", "border_radius", "stretch_x", "stretch_y", "fill", "border_size", "border_scale",
+        "outline_width", "outline_color", "fill_color", "alpha"
+    )
 
     def __init__(self):
         super().__init__(False)
@@ -80,6 +92,9 @@ class UIImageStyle(UICompStyle):
 
 class UIShapeStyle(UICompStyle):
     """Style class for the shape element component"""
+    __slots__ = (
+        "color", "outline_width", "type", "padding", "rect_border_radius", "polygon_points", "ellipse_padding_x", "ellipse_padding_y"
+    )
 
     def __init__(self):
         super().__init__(False)
@@ -93,8 +108,23 @@ class UIShapeStyle(UICompStyle):
         self.ellipse_padding_y: int = 20
 
 
+# the modifiers of a new pygame.Font
+_DEFAULT_FONT_MODS: tuple[int, bool, bool, bool, bool] = (pygame.FONT_LEFT, False, False, False, False)
+
+
 class UITextStyle(UICompStyle):
-    """Style class for the text element component"""
+    """
+    Style class for the text element component
+
+    A font built from a font name is shared by every text style with the same font, size and modifiers, so the font object must not be modified.
+    Change the style properties and call build_font and apply_mods instead, or assign a font of your own to the font attribute
+    """
+    __slots__ = (
+        "text", "color", "selection_color", "bg_color", "padding", "y_padding", "align", "antialas", "font_name", "font_size",
+        "sysfont", "font_align", "bold", "italic", "underline", "strikethrough", "do_wrap", "grow_x", "grow_y",
+        "cursor_color", "cursor_width", "cursor_rel_h", "cursor_enabled", "rich", "rich_modifiers",
+        "font", "_font_source", "_shared_font"
+    )
 
     def __init__(self):
         super().__init__(False)
@@ -123,19 +153,35 @@ class UITextStyle(UICompStyle):
         self.cursor_enabled: bool = False
         self.rich: bool = False
         self.rich_modifiers: bool = False
+        # how the font is built when it's shared with other styles, see common.shared_font
+        self._font_source: tuple | None = None
+        self._shared_font: pygame.Font | None = None
 
     def build_font(self) -> typing.Self:
-        """Build the font object after changes in the font properties"""
-        func = pygame.font.SysFont if self.sysfont else pygame.Font
+        """Build the font object after changes in the font properties. Fonts built from a name are shared and must not be modified"""
+        func = common.sysfont if self.sysfont and isinstance(self.font_name, str) else \
+            pygame.font.SysFont if self.sysfont else pygame.Font
         font_name = self.font_name
         if font_name == "googleicons":
             font_name = str(pathlib.Path(__file__).parent) + "/googleiconsfontttf.py"
             func = pygame.Font
-        self.font = func(font_name, int(self.font_size))
+        if isinstance(font_name, str):
+            self._font_source = (func, font_name, int(self.font_size))
+            self.font = self._shared_font = common.shared_font(*self._font_source, _DEFAULT_FONT_MODS)
+        else:
+            self._font_source = None
+            self.font = func(font_name, int(self.font_size))
         return self
 
     def apply_mods(self) -> typing.Self:
         """Apply text modifiers to the font object"""
+        # a shared font is swapped for the one with the right modifiers, a font set by hand is modified
+        if self._font_source is not None and self.font is self._shared_font:
+            self.font = self._shared_font = common.shared_font(
+                *self._font_source, (self.font_align, self.bold, self.italic, self.underline, self.strikethrough))
+            return self
+        if self.font.bold != self.bold or self.font.italic != self.italic:
+            common.clear_text_width_cache(self.font)
         self.font.align = self.font_align
         self.font.bold = self.bold
         self.font.italic = self.italic
@@ -146,6 +192,7 @@ class UITextStyle(UICompStyle):
 
 class UIIconStyle(UICompStyle):
     """Style class for the icon element component"""
+    __slots__ = ("name", "scale", "padding", "align")
 
     def __init__(self):
         super().__init__(False)
@@ -157,6 +204,7 @@ class UIIconStyle(UICompStyle):
 
 class UIOutlineStyle(UICompStyle):
     """Style class for the outline element component"""
+    __slots__ = ("color", "width", "border_radius", "navigation_color")
 
     def __init__(self):
         super().__init__(True)
@@ -168,6 +216,9 @@ class UIOutlineStyle(UICompStyle):
 
 class UIStyle:
     """Class that holds all the component styles and the animations"""
+    __slots__ = (
+        "stack", "bg", "image", "shape", "text", "icon", "outline", "style_group", "dirty", "animations", "styles", "__dict__"
+    )
 
     def __init__(self):
         self.stack: UIStackStyle = UIStackStyle()
@@ -225,6 +276,27 @@ def _default_press_style() -> UIStyle:
     return default_press
 
 
+_DEFAULT_STYLE_FACTORIES: dict[str, typing.Callable[[], UIStyle]] = {
+    "normal": _default_style,
+    "hover": _default_hover_style,
+    "press": _default_press_style,
+}
+
+
+def _style_properties(comp_style: UICompStyle | UIStackStyle) -> frozenset[str]:
+    # the public slots a new component style sets
+    return frozenset(name for cls in type(comp_style).__mro__ for name in getattr(cls, "__slots__", ())
+                     if not name.startswith("_") and hasattr(comp_style, name))
+
+
+# the properties of each component style, holders are checked against them once when made
+_STYLE_COMP_ATTRS: dict[str, frozenset[str]] = {
+    comp_name: _style_properties(comp_style_cls()) for comp_name, comp_style_cls in (
+        ("stack", UIStackStyle), ("bg", UIBGStyle), ("image", UIImageStyle), ("shape", UIShapeStyle),
+        ("text", UITextStyle), ("icon", UIIconStyle), ("outline", UIOutlineStyle))
+}
+
+
 class UIStyleHolder:
     """[Internal] Hold style data generated from a loaded script"""
 
@@ -239,6 +311,12 @@ class UIStyleHolder:
         self.style_type: str = style_type
         self.style_target: str = style_target
         self.target_id: str = target_id
+        for comp_name, comp_properties in properties.items():
+            if comp_name in _STYLE_COMP_ATTRS:
+                for name in comp_properties:
+                    if name not in _STYLE_COMP_ATTRS[comp_name]:
+                        raise UIError(
+                            f"{comp_name.title()} style has no property '{name}'")
 
     def copy_as_type(self, style_type: enums.StyleType | str) -> "UIStyleHolder":
         """Return the same holder with a different style_type"""
@@ -263,20 +341,36 @@ class UIStyleGroup:
 class UIStyles:
     """[Internal] Style manager for style holders"""
     styles: list[UIStyleHolder] = []
+    # style_type -> style_target -> target_id -> (position in styles, holder), so an element only visits the holders matching it
+    _index: dict[str, dict[str, dict[str, list[tuple[int, UIStyleHolder]]]]] = {}
+    # (element types, style id, element id, style type) -> merged properties and animations of the matching holders
+    _resolved: dict[tuple, tuple[tuple[tuple[str, str, typing.Any], ...], list]] = {}
+    # bumped when holders are added, style groups built before are outdated
+    version: int = 0
 
     @classmethod
     def add_style(cls, style_holder: UIStyleHolder) -> typing.Self:
         """[Internal] Add a style holder"""
-        cls.styles.append(style_holder)
+        cls._index_style(style_holder)
+        cls._resolved.clear()
+        cls.version += 1
         return cls
 
     @classmethod
     def add_styles(cls, *style_holders: UIStyleHolder) -> typing.Self:
         """[Internal] Add multipple style holders at once"""
         for holder in style_holders:
-            cls.styles.append(holder)
+            cls._index_style(holder)
+        cls._resolved.clear()
+        cls.version += 1
         return cls
 
+    @classmethod
+    def _index_style(cls, style_holder: UIStyleHolder):
+        cls._index.setdefault(style_holder.style_type, {}).setdefault(style_holder.style_target, {})\
+            .setdefault(style_holder.target_id, []).append((len(cls.styles), style_holder))
+        cls.styles.append(style_holder)
+
     @classmethod
     def get_style_group(cls, element: "Element") -> UIStyleGroup:
         """[Internal] Return a new style group for a given element using matching style holders"""
@@ -299,55 +393,52 @@ class UIStyles:
     @classmethod
     def get_style_of_type(cls, element: "Element", type_: enums.StyleType | str) -> tuple[UIStyle, list]:
         """[Internal] Return a new style for a given element using matching style holders of a given type"""
-        match type_:
-            case "normal":
-                style = _default_style()
-            case "hover":
-                style = _default_hover_style()
-            case "press":
-                style = _default_press_style()
+        style = _DEFAULT_STYLE_FACTORIES[type_]()
+        # elements of the same kind match the same holders, the styles are still made per element as they are mutable
+        key = (element.element_types, element.style_id, element.element_id, type_)
+        if (resolved := cls._resolved.get(key)) is None:
+            resolved = cls._resolved[key] = cls._resolve_holders(element, type_)
+        plan, animations = resolved
+        for comp_name, name, value in plan:
+            setattr(getattr(style, comp_name), name, value)
+        style.text.build_font()
+        style.text.apply_mods()
+        return style, animations
+
+    @classmethod
+    def _resolve_holders(cls, element: "Element", type_: enums.StyleType | str) -> tuple[tuple[tuple[str, str, typing.Any], ...], list]:
+        """[Internal] Merge the properties and the animations of the holders of a given type matching an element, later holders override.
+        The properties are flattened to the (component, property, value) assignments to make on a new style"""
         el_types, style_id, el_id = element.element_types, element.style_id.strip(
         ), element.element_id.strip()
-        style_id_styles, el_id_styles = [], []
+        style_ids = set(style_id.replace(" ", "").replace(",", ";").split(";"))
+        properties: dict[str, dict[str]] = {}
         animations: list = []
-        el_type_styles: dict[str, UIStyleHolder] = {
-            el_t: [] for el_t in el_types}
-        for style_holder in cls.styles:
-            if style_holder.style_type != type_:
-                continue
-            if style_holder.style_target == "element_type" and style_holder.target_id in el_type_styles:
-                el_type_styles[style_holder.target_id].append(style_holder)
-            elif style_holder.style_target == "style_id" and style_holder.target_id in style_id.replace(" ", "").replace(",", ";").split(";"):
-                style_id_styles.append(style_holder)
-            elif style_holder.style_target == "element_id" and style_holder.target_id == el_id:
-                el_id_styles.append(style_holder)
-        for el_type_styles_i in el_type_styles.values():
-            for el_type_style in el_type_styles_i:
-                cls.apply_style_properties(el_type_style.properties, style)
-                animations = cls.update_style_animations(
-                    animations, el_type_style.animations)
-        for style_id_style in style_id_styles:
-            cls.apply_style_properties(style_id_style.properties, style)
+        targets = cls._index.get(type_, {})
+        by_el_type, by_style_id, by_el_id = targets.get("element_type", {}), targets.get("style_id", {}), targets.get("element_id", {})
+        # element types apply in the element's order, style ids in the order the holders were added
+        el_type_styles = [style_holder for el_t in dict.fromkeys(el_types) for _, style_holder in by_el_type.get(el_t, ())]
+        style_id_styles = [style_holder for _, style_holder in
+                           sorted(indexed for s_id in style_ids for indexed in by_style_id.get(s_id, ()))]
+        el_id_styles = [style_holder for _, style_holder in by_el_id.get(el_id, ())]
+        for style_holder in itertools.chain(el_type_styles, style_id_styles, el_id_styles):
+            for comp_name, comp_properties in style_holder.properties.items():
+                properties.setdefault(comp_name, {}).update(comp_properties)
             animations = cls.update_style_animations(
-                animations, style_id_style.animations)
-        for el_id_style in el_id_styles:
-            cls.apply_style_properties(el_id_style.properties, style)
-            animations = cls.update_style_animations(
-                animations, el_id_style.animations)
-        style.text.build_font()
-        style.text.apply_mods()
-        return style, animations
+                animations, style_holder.animations)
+        # unknown component names are ignored like in apply_style_properties
+        plan = tuple((comp_name, name, value) for comp_name, comp_properties in properties.items()
+                     if comp_name in _STYLE_COMP_ATTRS for name, value in comp_properties.items())
+        return plan, animations
 
     @classmethod
     def apply_style_properties(cls, properties: dict[str, dict[str]], style: UIStyle):
         """[Internal] Apply a property dictionary to a UIStyle"""
-        for comp_name in ["stack", "bg", "image", "shape", "text", "icon", "outline"]:
-            if comp_name in properties:
+        # holders usually touch a few components, unknown names are ignored. the names were checked by the holders
+        for comp_name, comp_properties in properties.items():
+            if comp_name in _STYLE_COMP_ATTRS:
                 comp = getattr(style, comp_name)
-                for name, value in properties[comp_name].items():
-                    if not hasattr(comp, name):
-                        raise UIError(
-                            f"{comp_name.title()} style has no property '{name}'")
+                for name, value in comp_properties.items():
                     setattr(comp, name, value)
 
     @classmethod
@@ -10,6 +10,8 @@ class Tooltips:
     hover_time: float = 1200
     tooltips: list[dict[str]] = []
     active_tooltip: "Element" = None
+    # data of the hovered element, its tooltip may not be built yet
+    _active_data: dict[str] | None = None
 
     @classmethod
     def set_hover_time(cls, hover_time_ms: float) -> typing.Self:
@@ -18,13 +20,12 @@ class Tooltips:
         return cls
 
     @classmethod
-    def register(cls, tooltip: "Element", element: "Element") -> typing.Self:
-        """Register a tooltip and an element for the tooltip to appear on prolungated hover. Automated by Element.set_tooltip"""
-        already = False
-        for tt_data in list(cls.tooltips):
-            if tt_data["el"] is element:
-                cls.tooltips.remove(tt_data)
-                already = True
+    def register(cls, tooltip: "Element | None", element: "Element") -> typing.Self:
+        """Register a tooltip and an element for the tooltip to appear on prolungated hover. Automated by Element.set_tooltip. If tooltip is None the element's tooltip is used when it's first hovered"""
+        # a single pass instead of a copy plus one remove scan per match
+        remaining = [tt_data for tt_data in cls.tooltips if tt_data["el"] is not element]
+        already = len(remaining) != len(cls.tooltips)
+        cls.tooltips[:] = remaining
         if not already:
             element.status.add_listener("on_start_hover", cls._on_start_hover)
             element.status.add_listener("on_stop_hover", cls._on_stop_hover)
@@ -42,37 +43,40 @@ class Tooltips:
         if cls.active_tooltip is not None:
             cls.active_tooltip.hide()
         cls.active_tooltip = None
+        cls._active_data = None
         for tt_data in cls.tooltips:
             if tt_data["el"] is element:
                 tt_data["start_hover_time"] = pygame.time.get_ticks()
                 cls.active_tooltip = tt_data["tt"]
+                cls._active_data = tt_data
 
     @classmethod
     def _on_stop_hover(cls):
         if cls.active_tooltip is not None:
             cls.active_tooltip.hide()
         cls.active_tooltip = None
+        cls._active_data = None
 
     @classmethod
     def _logic(cls):
-        if cls.active_tooltip is not None:
-            tt_data: dict[str] = None
-            for tt_data_i in cls.tooltips:
-                if tt_data_i["tt"] is cls.active_tooltip:
-                    tt_data = tt_data_i
-                    break
-            if tt_data is None:
+        tt_data = cls._active_data
+        if tt_data is None:
+            return
+        tt: "Element | None" = tt_data["tt"]
+        if tt is None or not tt.status.visible:
+            if UIState.mouse_moved:
+                tt_data["start_hover_time"] = pygame.time.get_ticks()
+            if pygame.time.get_ticks()-tt_data["start_hover_time"] < cls.hover_time:
                 return
-            if not cls.active_tooltip.status.visible:
-                if UIState.mouse_rel.length() != 0:
-                    tt_data["start_hover_time"] = pygame.time.get_ticks()
-                if pygame.time.get_ticks()-tt_data["start_hover_time"] >= cls.hover_time:
-                    cls.active_tooltip.show()
-            tt: "Element" = tt_data["tt"]
-            px, py = UIState.mouse_pos.x, UIState.mouse_pos.y+10
-            win_size = pygame.display.get_window_size()
-            if px+tt.relative_rect.w > win_size[0]:
-                px = win_size[0]-tt.relative_rect.w
-            if py+tt.relative_rect.h > win_size[1]:
-                py = UIState.mouse_pos.y-10-tt.relative_rect.h
-            tt.set_absolute_pos((px, py))
+            if tt is None:
+                # lazy tooltips are only built once they have to appear
+                tt = tt_data["tt"] = tt_data["el"].tooltip
+                cls.active_tooltip = tt
+            tt.show()
+        px, py = UIState.mouse_pos.x, UIState.mouse_pos.y+10
+        win_size = pygame.display.get_window_size()
+        if px+tt.relative_rect.w > win_size[0]:
+            px = win_size[0]-tt.relative_rect.w
+        if py+tt.relative_rect.h > win_size[1]:
+            py = UIState.mouse_pos.y-10-tt.relative_rect.h
+        tt.set_absolute_pos((px, py))
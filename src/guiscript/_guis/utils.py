@@ -154,7 +154,7 @@ def static_dock(root: Element, ids_elements: list[tuple[int, Element]], ids_root
 
 def dragging_mouse() -> bool:
     """Return whether the mouse is being dragged"""
-    return UIState.mouse_rel.length() > 0
+    return UIState.mouse_moved
 
 
 def ZeroRect() -> pygame.Rect:
@@ -177,6 +177,7 @@ def static_logic(delta_time: float = 1):
     UIState.delta_time = delta_time
     UIState.mouse_pos = pygame.Vector2(pygame.mouse.get_pos())
     UIState.mouse_rel = pygame.Vector2(pygame.mouse.get_rel())
+    UIState.mouse_moved = UIState.mouse_rel.x != 0 or UIState.mouse_rel.y != 0
     UIState.mouse_pressed = pygame.mouse.get_pressed()
     UIState.keys_pressed = pygame.key.get_pressed()
     UIState.just_pressed = pygame.key.get_just_pressed()
@@ -3,7 +3,6 @@ import sys, os
 import guiscript as guis
 from pygame import Rect as rect
 
-pygame.Rect()
 W, H = 1200, 800
 pygame.init()
 screen = pygame.display.set_mode((W, H), pygame.RESIZABLE)
@@ -85,6 +84,6 @@ while True:
     guis.static_logic(1)
     manager.render()
 
-    clock.tick_busy_loop(0)
+    clock.tick(120)
     pygame.display.flip()
     pygame.display.set_caption(f"{clock.get_fps():.0f} FPS")